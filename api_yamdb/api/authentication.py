@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+TOKEN_VERSION_KEY = 'auth:token_version:{}'
+TOKEN_VERSION_TIMEOUT = 300
+CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'token_version')
+
+
+def access_token_for(user):
+    token = AccessToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+def get_token_version(user_id):
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.using(DEFAULT_DB_ALIAS).filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден', code='user_not_found'
+            )
+        cache.set(key, version, TOKEN_VERSION_TIMEOUT)
+    return version
+
+
+def forget_token_version(user_id):
+    cache.delete(TOKEN_VERSION_KEY.format(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if any(field not in validated_token for field in CLAIM_FIELDS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатор пользователя'
+            )
+        if validated_token['token_version'] != get_token_version(user_id):
+            raise AuthenticationFailed(
+                'Токен отозван, получите новый', code='token_revoked'
+            )
+        claims = {field: validated_token[field] for field in CLAIM_FIELDS}
+        claims.update(id=user_id, is_active=True)
+        fields = [field.attname for field in User._meta.concrete_fields
+                  if field.attname in claims]
+        return User.from_db(
+            router.db_for_read(User),
+            fields,
+            [claims[field] for field in fields]
+        )
@@ -0,0 +1,157 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag)
+from rest_framework import status
+from rest_framework.response import Response
+
+from .routing import primary_if_modified
+
+VERSION_KEY = 'api:version:{}'
+MODIFIED_KEY = 'api:modified:{}'
+RESPONSE_KEY = 'api:response:{}:{}:{}:{}'
+LOCK_KEY = 'api:lock:{}'
+TITLE_SECTIONS = 'titles:sections'
+
+
+def title_namespace(title_id):
+    return f'title:{title_id}'
+
+
+def get_version(namespace):
+    if isinstance(namespace, tuple):
+        return '.'.join(str(get_version(part)) for part in namespace)
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        cache.add(MODIFIED_KEY.format(namespace), int(time.time()), None)
+        version = cache.get(key)
+    return version
+
+
+def get_last_modified(namespace):
+    if isinstance(namespace, tuple):
+        return max(
+            (stamp for stamp in map(get_last_modified, namespace)
+             if stamp is not None),
+            default=None
+        )
+    return cache.get(MODIFIED_KEY.format(namespace))
+
+
+def bump_version(*namespaces):
+    now = int(time.time())
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+        cache.set(MODIFIED_KEY.format(namespace), now, None)
+
+
+def bump_version_on_commit(*namespaces):
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+def response_cache_key(request, namespace):
+    authenticator = request.successful_authenticator
+    auth = type(authenticator).__name__ if authenticator else 'anonymous'
+    query = sorted(request.query_params.lists())
+    digest = hashlib.md5(
+        f'{request.path}?{query}'.encode('utf-8')
+    ).hexdigest()
+    name = ','.join(namespace) if isinstance(namespace, tuple) else namespace
+    return RESPONSE_KEY.format(name, get_version(namespace), auth, digest)
+
+
+class VersionedViewMixin:
+    cache_namespace = None
+
+    def get_cache_namespace(self):
+        return self.cache_namespace
+
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def versioned_response(self, handler, request, *args, **kwargs):
+        namespace = self.get_cache_namespace()
+        with primary_if_modified(get_last_modified(namespace)):
+            return handler(request, *args, **kwargs)
+
+
+class ConditionalGetMixin(VersionedViewMixin):
+
+    def versioned_response(self, handler, request, *args, **kwargs):
+        namespace = self.get_cache_namespace()
+        digest = hashlib.md5(
+            f'{request.get_full_path()}:{request.accepted_renderer.format}'
+            .encode('utf-8')
+        ).hexdigest()[:16]
+        etag = quote_etag(f'{get_version(namespace)}-{digest}')
+        last_modified = get_last_modified(namespace)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+        )
+        if if_none_match is not None:
+            not_modified = (etag in parse_etags(if_none_match)
+                            or if_none_match.strip() == '*')
+        else:
+            not_modified = (last_modified is not None
+                            and if_modified_since is not None
+                            and last_modified <= if_modified_since)
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().versioned_response(
+                handler, request, *args, **kwargs
+            )
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CachedResponseMixin(VersionedViewMixin):
+    cache_timeout = 300
+    cache_lock_timeout = 5
+    cache_wait_interval = 0.05
+
+    def versioned_response(self, handler, request, *args, **kwargs):
+        key = response_cache_key(request, self.get_cache_namespace())
+        cached = cache.get(key)
+        if cached is not None:
+            return Response(cached)
+        lock = LOCK_KEY.format(key)
+        locked = cache.add(lock, 1, self.cache_lock_timeout)
+        if not locked:
+            deadline = time.monotonic() + self.cache_lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.cache_wait_interval)
+                cached = cache.get(key)
+                if cached is not None:
+                    return Response(cached)
+        try:
+            response = super().versioned_response(
+                handler, request, *args, **kwargs
+            )
+            if response.status_code == 200:
+                cache.set(key, response.data, self.cache_timeout)
+        finally:
+            if locked:
+                cache.delete(lock)
+        return response
@@ -1,16 +1,82 @@
 import django_filters
+from django.db import connections
+from django.db.models import Exists, OuterRef
+from django.db.models.expressions import RawSQL
 from reviews.models import Title
 
+SEARCH_CONFIG = 'russian'
+POSTGRES_DOCUMENT = (
+    "to_tsvector('russian', coalesce(reviews_title.name, '') || ' ' || "
+    "coalesce(reviews_title.description, ''))"
+)
+
+
+def search_postgresql(queryset, value):
+    rank = RawSQL(
+        f'ts_rank({POSTGRES_DOCUMENT}, '
+        f'plainto_tsquery(%s, %s)) + similarity(reviews_title.name, %s)',
+        (SEARCH_CONFIG, value, value)
+    )
+    return queryset.extra(
+        where=[f'({POSTGRES_DOCUMENT} @@ plainto_tsquery(%s, %s) '
+               f'OR reviews_title.name %% %s)'],
+        params=[SEARCH_CONFIG, value, value]
+    ).annotate(search_rank=rank).order_by('-search_rank', 'name')
+
+
+def search_sqlite(queryset, value):
+    terms = ' '.join(
+        '"{}"*'.format(term.replace('"', '""')) for term in value.split()
+    )
+    if not terms:
+        return queryset
+    rank = RawSQL(
+        'SELECT -bm25(reviews_title_fts) FROM reviews_title_fts '
+        'WHERE reviews_title_fts MATCH %s '
+        'AND reviews_title_fts.rowid = reviews_title.id',
+        (terms,)
+    )
+    return queryset.extra(
+        where=['reviews_title.id IN (SELECT rowid FROM reviews_title_fts '
+               'WHERE reviews_title_fts MATCH %s)'],
+        params=[terms]
+    ).annotate(search_rank=rank).order_by('-search_rank', 'name')
+
+
+SEARCH_BACKENDS = {
+    'postgresql': search_postgresql,
+    'sqlite': search_sqlite,
+}
+
 
 class TitleFilter(django_filters.FilterSet):
     category = django_filters.CharFilter(field_name='category__slug')
-    genre = django_filters.CharFilter(field_name='genre__slug')
+    genre = django_filters.CharFilter(method='filter_genre')
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
     year = django_filters.NumberFilter(field_name='year')
+    search = django_filters.CharFilter(method='filter_search')
+    ordering = django_filters.OrderingFilter(fields=(
+        ('name', 'name'),
+        ('year', 'year'),
+        ('rating_average', 'rating'),
+    ))
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'year', 'name')
+        fields = ('category', 'genre', 'year', 'name', 'search')
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.annotate(in_genre=Exists(
+            Title.genre.through.objects.filter(
+                title_id=OuterRef('pk'), genre__slug=value
+            )
+        )).filter(in_genre=True)
+
+    def filter_search(self, queryset, name, value):
+        backend = SEARCH_BACKENDS.get(connections[queryset.db].vendor)
+        if backend is None:
+            return queryset.filter(name__icontains=value)
+        return backend(queryset, value)
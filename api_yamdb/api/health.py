@@ -0,0 +1,58 @@
+import time
+
+from django.db import DatabaseError, connections
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+startup = {'started_at': None, 'duration': None}
+
+
+def mark_ready(started):
+    startup['started_at'] = started
+    startup['duration'] = time.monotonic() - started
+
+
+def ping(alias):
+    connection = connections[alias]
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return (time.perf_counter() - started) * 1000
+
+
+def check_connections():
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
+
+
+class ReadinessView(APIView):
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    throttle_classes = ()
+
+    def get(self, request):
+        databases, ready = {}, True
+        for alias in connections:
+            try:
+                databases[alias] = {'ok': True,
+                                    'latency_ms': round(ping(alias), 3)}
+            except DatabaseError as error:
+                ready = False
+                databases[alias] = {'ok': False, 'error': str(error)}
+        started = startup['started_at']
+        return Response(
+            {
+                'ready': ready,
+                'databases': databases,
+                'startup_seconds': startup['duration'],
+                'uptime_seconds': (
+                    None if started is None else time.monotonic() - started
+                ),
+            },
+            status=(status.HTTP_200_OK if ready
+                    else status.HTTP_503_SERVICE_UNAVAILABLE)
+        )
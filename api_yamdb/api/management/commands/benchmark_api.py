@@ -0,0 +1,290 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.authentication import access_token_for
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+SAFE_METHODS = ('get', 'head', 'options')
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет все маршруты API через тестовый клиент, пишет '
+            'p50/p95/p99 и число запросов к базе в JSON-отчёт и '
+            'сравнивает его с сохранённым эталоном.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument(
+            '--baseline',
+            help='Отчёт, с которым сравнивать результаты.'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=20.0,
+            help='Допустимый рост p95 относительно эталона, в процентах.'
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кеш перед каждым запросом.'
+        )
+        parser.add_argument(
+            '--only',
+            help='Запускать только сценарии, содержащие эту подстроку.'
+        )
+        parser.add_argument(
+            '--throttle',
+            action='store_true',
+            help='Не отключать ограничение частоты запросов.'
+        )
+
+    def handle(self, *args, **options):
+        if options['throttle']:
+            return self.run(options)
+        with override_settings(REST_FRAMEWORK=dict(
+            settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+        )):
+            return self.run(options)
+
+    def run(self, options):
+        scenarios = self.build_scenarios()
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios
+                         if options['only'] in scenario[0]]
+        results = {}
+        for name, method, path, data, client in scenarios:
+            results[name] = self.run_scenario(
+                method, path, data, client, options
+            )
+            result = results[name]
+            self.stdout.write(
+                f'{name:<40} {result["status"]} '
+                f'p50={result["p50"]:.2f} p95={result["p95"]:.2f} '
+                f'p99={result["p99"]:.2f} мс, запросов {result["queries"]}'
+            )
+        report = {
+            'created': timezone.now().isoformat(),
+            'iterations': options['iterations'],
+            'cold': options['cold'],
+            'dataset': {
+                model._meta.model_name: model.objects.count()
+                for model in (User, Category, Genre, Title, Review, Comment)
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Отчёт сохранён в {options["output"]}')
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def client_for(self, user):
+        return Client(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}'
+        )
+
+    def build_scenarios(self):
+        admin = User.objects.filter(role=User.ADMIN).first()
+        hot = Title.objects.annotate(
+            total=Count('reviews')
+        ).order_by('-total').first()
+        review = Review.objects.filter(title=hot).annotate(
+            total=Count('comments')
+        ).order_by('-total').first()
+        if admin is None or review is None:
+            raise CommandError(
+                'Нужны администратор и отзывы: запустите generate_dataset'
+            )
+        comment = review.comments.first()
+        genre = hot.genre.first()
+        author = review.author
+        outsider = User.objects.exclude(reviews__title=hot).first()
+        anonymous = Client()
+        staff = self.client_for(admin)
+        titles = f'/api/v1/titles/{hot.pk}'
+        reviews = f'{titles}/reviews'
+        comments = f'{reviews}/{review.pk}/comments'
+        word = hot.name.split()[0]
+        scenarios = [
+            ('TitleViewSet.list', 'get', '/api/v1/titles/', None, anonymous),
+            ('TitleViewSet.list:genre', 'get',
+             f'/api/v1/titles/?genre={genre.slug if genre else ""}',
+             None, anonymous),
+            ('TitleViewSet.list:search', 'get',
+             f'/api/v1/titles/?search={word}', None, anonymous),
+            ('TitleViewSet.list:fields', 'get',
+             '/api/v1/titles/?fields=id,name,rating', None, anonymous),
+            ('TitleViewSet.retrieve', 'get', f'{titles}/', None, anonymous),
+            ('TitleViewSet.list:rating', 'get',
+             '/api/v1/titles/?ordering=-rating,-year', None, anonymous),
+            ('TitleViewSet.top', 'get', '/api/v1/titles/top/', None,
+             anonymous),
+            ('TitleViewSet.scores', 'get', f'{titles}/scores/', None,
+             anonymous),
+            ('TitleViewSet.create', 'post', '/api/v1/titles/',
+             {'name': 'benchmark', 'year': 2000, 'genre': [],
+              'category': hot.category.slug if hot.category else None},
+             staff),
+            ('TitleViewSet.partial_update', 'patch', f'{titles}/',
+             {'name': 'benchmark'}, staff),
+            ('TitleViewSet.destroy', 'delete', f'{titles}/', None, staff),
+            ('TitleViewSet.bulk', 'post', '/api/v1/titles/bulk/',
+             [{'name': f'benchmark {index}', 'year': 2000}
+              for index in range(50)], staff),
+            ('CategoryViewSet.list', 'get', '/api/v1/categories/', None,
+             anonymous),
+            ('CategoryViewSet.stats', 'get', '/api/v1/categories/stats/',
+             None, anonymous),
+            ('CategoryViewSet.create', 'post', '/api/v1/categories/',
+             {'name': 'benchmark', 'slug': 'benchmark'}, staff),
+            ('CategoryViewSet.destroy', 'delete',
+             f'/api/v1/categories/{Category.objects.first().slug}/',
+             None, staff),
+            ('GenreViewSet.list', 'get', '/api/v1/genres/', None, anonymous),
+            ('GenreViewSet.stats', 'get', '/api/v1/genres/stats/', None,
+             anonymous),
+            ('GenreViewSet.create', 'post', '/api/v1/genres/',
+             {'name': 'benchmark', 'slug': 'benchmark'}, staff),
+            ('GenreViewSet.destroy', 'delete',
+             f'/api/v1/genres/{Genre.objects.first().slug}/', None, staff),
+            ('ReviewsViewSet.list', 'get', f'{reviews}/', None, anonymous),
+            ('ReviewsViewSet.list:cursor', 'get',
+             f'{reviews}/?pagination=cursor', None, anonymous),
+            ('ReviewsViewSet.retrieve', 'get', f'{reviews}/{review.pk}/',
+             None, anonymous),
+            ('ReviewsViewSet.partial_update', 'patch',
+             f'{reviews}/{review.pk}/', {'text': 'benchmark'},
+             self.client_for(author)),
+            ('ReviewsViewSet.destroy', 'delete', f'{reviews}/{review.pk}/',
+             None, staff),
+            ('CommentsViewSet.list', 'get', f'{comments}/', None, anonymous),
+            ('CommentsViewSet.create', 'post', f'{comments}/',
+             {'text': 'benchmark'}, staff),
+            ('ModerationViewSet.reviews', 'post',
+             '/api/v1/moderation/reviews/', {'author': author.username},
+             staff),
+            ('ModerationViewSet.comments', 'post',
+             '/api/v1/moderation/comments/', {'author': author.username},
+             staff),
+            ('UserViewSet.list', 'get', '/api/v1/users/', None, staff),
+            ('UserViewSet.retrieve', 'get',
+             f'/api/v1/users/{author.username}/', None, staff),
+            ('UserViewSet.create', 'post', '/api/v1/users/',
+             {'username': 'benchmark', 'email': 'benchmark@yamdb.fake'},
+             staff),
+            ('UserViewSet.partial_update', 'patch',
+             f'/api/v1/users/{author.username}/', {'bio': 'benchmark'},
+             staff),
+            ('UserViewSet.destroy', 'delete',
+             f'/api/v1/users/{author.username}/', None, staff),
+            ('UserViewSet.users_profile', 'get', '/api/v1/users/me/', None,
+             staff),
+            ('SignUp.post', 'post', '/api/v1/auth/signup/',
+             {'username': 'benchmark', 'email': 'benchmark@yamdb.fake'},
+             anonymous),
+            ('GetToken.post', 'post', '/api/v1/auth/token/',
+             {'username': admin.username,
+              'confirmation_code': default_token_generator.make_token(admin)},
+             anonymous),
+            ('ExportView.get', 'get', '/api/v1/export/category/', None,
+             staff),
+            ('MetricsView.get', 'get', '/api/v1/metrics/', None, staff),
+            ('ReadinessView.get', 'get', '/api/v1/ready/', None, anonymous),
+        ]
+        if outsider is not None:
+            scenarios.append((
+                'ReviewsViewSet.create', 'post', f'{reviews}/',
+                {'text': 'benchmark', 'score': 5},
+                self.client_for(outsider)
+            ))
+        if comment is not None:
+            scenarios += [
+                ('CommentsViewSet.retrieve', 'get',
+                 f'{comments}/{comment.pk}/', None, anonymous),
+                ('CommentsViewSet.partial_update', 'patch',
+                 f'{comments}/{comment.pk}/', {'text': 'benchmark'}, staff),
+                ('CommentsViewSet.destroy', 'delete',
+                 f'{comments}/{comment.pk}/', None, staff),
+            ]
+        return scenarios
+
+    def request(self, method, path, data, client, cold):
+        if cold:
+            cache.clear()
+        kwargs = {}
+        if data is not None:
+            kwargs = {'data': json.dumps(data),
+                      'content_type': 'application/json'}
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        return elapsed * 1000, len(queries), response.status_code
+
+    def run_scenario(self, method, path, data, client, options):
+        timings, counts, status = [], [], None
+        total = options['warmup'] + options['iterations']
+        for iteration in range(total):
+            with transaction.atomic():
+                elapsed, queries, status = self.request(
+                    method, path, data, client, options['cold']
+                )
+                if method not in SAFE_METHODS:
+                    transaction.set_rollback(True)
+            if iteration >= options['warmup']:
+                timings.append(elapsed)
+                counts.append(queries)
+        return {
+            'method': method.upper(),
+            'path': path,
+            'status': status,
+            'p50': percentile(timings, 50),
+            'p95': percentile(timings, 95),
+            'p99': percentile(timings, 99),
+            'mean': sum(timings) / len(timings),
+            'queries': percentile(counts, 50),
+        }
+
+    def compare(self, results, path, tolerance):
+        with open(path, encoding='utf-8') as source:
+            baseline = json.load(source)['results']
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before = baseline[name]
+            change = (result['p95'] / before['p95'] - 1) * 100 if (
+                before['p95']) else 0.0
+            self.stdout.write(
+                f'{name:<40} p95 {before["p95"]:.2f} -> '
+                f'{result["p95"]:.2f} мс ({change:+.0f}%), запросов '
+                f'{before["queries"]} -> {result["queries"]}'
+            )
+            if change > tolerance or result['queries'] > before['queries']:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(
+                f'Регрессия относительно эталона: {", ".join(regressions)}'
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
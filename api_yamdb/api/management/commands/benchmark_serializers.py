@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.representations import (COMMENT_VALUES, REVIEW_VALUES,
+                                 TITLE_VALUES, represent_comments,
+                                 represent_reviews, represent_titles)
+from api.serializers import (CommentSerializer, ReadTitleSerializer,
+                             ReviewSerializer)
+from reviews.models import Comment, Review, Title
+
+CASES = (
+    ('titles', ReadTitleSerializer, represent_titles, TITLE_VALUES,
+     lambda: Title.objects.select_related('category').prefetch_related(
+         'genre')),
+    ('reviews', ReviewSerializer, represent_reviews, REVIEW_VALUES,
+     lambda: Review.objects.select_related('author')),
+    ('comments', CommentSerializer, represent_comments, COMMENT_VALUES,
+     lambda: Comment.objects.select_related('author')),
+)
+
+
+class Command(BaseCommand):
+    help = ('Сверяет быстрое чтение через values() с сериализаторами '
+            'и сравнивает их скорость на данных из базы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        limit, repeat = options['limit'], options['repeat']
+        for name, serializer_class, represent, values, queryset in CASES:
+            objects = list(queryset().order_by('pk')[:limit])
+            if not objects:
+                self.stdout.write(f'{name}: нет данных, пропускаю')
+                continue
+            expected = [dict(item) for item in serializer_class(
+                objects, many=True
+            ).data]
+            rows = list(queryset().prefetch_related(None).order_by(
+                'pk').values(*values)[:limit])
+            actual = represent(rows)
+            if actual != expected:
+                mismatch = next(
+                    index for index, (left, right)
+                    in enumerate(zip(actual, expected)) if left != right
+                )
+                raise CommandError(
+                    f'{name}: формат ответа расходится, '
+                    f'{actual[mismatch]} != {expected[mismatch]}'
+                )
+            slow = self.measure(
+                lambda: serializer_class(
+                    list(queryset().order_by('pk')[:limit]), many=True
+                ).data,
+                repeat
+            )
+            fast = self.measure(
+                lambda: represent(
+                    queryset().prefetch_related(None).order_by(
+                        'pk').values(*values)[:limit]
+                ),
+                repeat
+            )
+            count = len(objects)
+            self.stdout.write(
+                f'{name}: {count} объектов, сериализатор '
+                f'{slow / count * 1e6:.1f} мкс/объект, values() '
+                f'{fast / count * 1e6:.1f} мкс/объект, '
+                f'ускорение x{slow / fast:.1f}'
+            )
+
+    def measure(self, function, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
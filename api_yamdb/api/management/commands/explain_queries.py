@@ -0,0 +1,206 @@
+import re
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count
+from django.test import Client
+
+from reviews.models import (Category, Comment, Genre, Review,
+                            ScoreHistogram, Title, TitleRanking)
+
+WATCHED = {Title._meta.db_table, Review._meta.db_table,
+           Comment._meta.db_table, Title.genre.through._meta.db_table,
+           TitleRanking._meta.db_table, ScoreHistogram._meta.db_table}
+FROM_TABLE = re.compile(r'\bFROM "?(\w+)"?', re.IGNORECASE)
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class QueryLog:
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            self.queries.append((self.alias, sql, params))
+        return execute(sql, params, many, context)
+
+
+def main_table(sql):
+    match = FROM_TABLE.search(sql)
+    return match.group(1) if match else None
+
+
+def explain_sqlite(cursor, sql, params):
+    cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+    plan = [row[-1] for row in cursor.fetchall()]
+    problems = []
+    for line in plan:
+        scan = SQLITE_SCAN.match(line)
+        if scan and scan.group(1) in WATCHED and 'USING' not in line:
+            problems.append(line)
+    if main_table(sql) in WATCHED:
+        problems += [line for line in plan
+                     if line.startswith('USE TEMP B-TREE FOR')
+                     and 'ORDER BY' in line]
+    return plan, problems
+
+
+def explain_postgresql(cursor, sql, params):
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_sort = off')
+        cursor.execute(f'EXPLAIN {sql}', params)
+        plan = [row[0] for row in cursor.fetchall()]
+    problems = []
+    watched = main_table(sql) in WATCHED
+    for line in plan:
+        scan = POSTGRES_SCAN.search(line)
+        if scan and scan.group(1) in WATCHED:
+            problems.append(line.strip())
+        elif watched and line.strip().lstrip('-> ').startswith('Sort'):
+            problems.append(line.strip())
+    return plan, problems
+
+
+EXPLAINERS = {
+    'sqlite': explain_sqlite,
+    'postgresql': explain_postgresql,
+}
+
+
+class Command(BaseCommand):
+    help = ('Запускает EXPLAIN для основных запросов каждого эндпоинта '
+            'и падает, если план читает таблицу целиком или сортирует.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            help='Проверять только сценарии, содержащие эту подстроку.'
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Печатать планы всех проверенных запросов.'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = self.build_scenarios()
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios
+                         if options['only'] in scenario[0]]
+        failures = []
+        for name, table, source in scenarios:
+            queries = (self.capture(source) if isinstance(source, str)
+                       else [self.compile(source)])
+            main = [query for query in queries
+                    if main_table(query[1]) == table]
+            if not main:
+                raise CommandError(f'{name}: не найден запрос к {table}')
+            for alias, sql, params in main:
+                connection = connections[alias]
+                explain = EXPLAINERS.get(connection.vendor)
+                if explain is None:
+                    raise CommandError(
+                        f'EXPLAIN для {connection.vendor} не поддерживается'
+                    )
+                with connection.cursor() as cursor:
+                    plan, problems = explain(cursor, sql, params)
+                if problems:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(
+                        f'{name}: {"; ".join(problems)}'
+                    ))
+                else:
+                    self.stdout.write(f'{name}: ok')
+                if problems or options['plans']:
+                    self.stdout.write(f'    {sql}')
+                    for line in plan:
+                        self.stdout.write(f'    {line}')
+        if failures:
+            raise CommandError(
+                f'Планы без индекса: {", ".join(sorted(set(failures)))}'
+            )
+        self.stdout.write(self.style.SUCCESS('Все запросы используют индексы'))
+
+    def capture(self, path):
+        cache.clear()
+        with ExitStack() as stack:
+            logs = []
+            for connection in connections.all():
+                log = QueryLog(connection.alias)
+                stack.enter_context(connection.execute_wrapper(log))
+                logs.append(log)
+            response = Client().get(path)
+        if response.status_code != 200:
+            raise CommandError(f'{path}: ответ {response.status_code}')
+        return [query for log in logs for query in log.queries]
+
+    def compile(self, queryset):
+        sql, params = queryset.query.get_compiler(
+            using=DEFAULT_DB_ALIAS
+        ).as_sql()
+        return DEFAULT_DB_ALIAS, sql, params
+
+    def next_page(self, path):
+        return Client().get(path).data['next'] or path
+
+    def build_scenarios(self):
+        review = Review.objects.annotate(
+            total=Count('comments')
+        ).order_by('-total').select_related('title__category').first()
+        if review is None:
+            raise CommandError(
+                'Нужны отзывы и комментарии: запустите generate_dataset'
+            )
+        title = review.title
+        genre = title.genre.first()
+        titles = Title._meta.db_table
+        reviews = f'/api/v1/titles/{title.pk}/reviews/'
+        comments = f'{reviews}{review.pk}/comments/'
+        scenarios = [
+            ('titles', titles, '/api/v1/titles/'),
+            ('titles:year', titles, f'/api/v1/titles/?year={title.year}'),
+            ('titles:rating', titles, '/api/v1/titles/?ordering=-rating'),
+            ('titles:retrieve', titles, f'/api/v1/titles/{title.pk}/'),
+            ('titles:top', TitleRanking._meta.db_table,
+             '/api/v1/titles/top/'),
+            ('titles:scores', ScoreHistogram._meta.db_table,
+             f'/api/v1/titles/{title.pk}/scores/'),
+            ('reviews', Review._meta.db_table, reviews),
+            ('reviews:cursor', Review._meta.db_table,
+             f'{reviews}?pagination=cursor'),
+            ('reviews:cursor:next', Review._meta.db_table,
+             self.next_page(f'{reviews}?pagination=cursor')),
+            ('reviews:retrieve', Review._meta.db_table,
+             f'{reviews}{review.pk}/'),
+            ('comments', Comment._meta.db_table, comments),
+            ('comments:cursor', Comment._meta.db_table,
+             f'{comments}?pagination=cursor'),
+            ('comments:cursor:next', Comment._meta.db_table,
+             self.next_page(f'{comments}?pagination=cursor')),
+            ('genres:stats', Genre._meta.db_table, '/api/v1/genres/stats/'),
+            ('categories:stats', Category._meta.db_table,
+             '/api/v1/categories/stats/'),
+            ('reviews:author_title', Review._meta.db_table,
+             Review.objects.filter(
+                 author_id=review.author_id, title_id=title.pk
+             ).values('pk')[:1]),
+        ]
+        if title.category is not None:
+            scenarios.append((
+                'titles:category', titles,
+                f'/api/v1/titles/?category={title.category.slug}'
+            ))
+        if genre is not None:
+            scenarios += [
+                ('titles:genre', titles,
+                 f'/api/v1/titles/?genre={genre.slug}'),
+                ('titles:top:genre', TitleRanking._meta.db_table,
+                 f'/api/v1/titles/top/?genre={genre.slug}'),
+            ]
+        return scenarios
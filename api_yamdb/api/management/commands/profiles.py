@@ -0,0 +1,102 @@
+import io
+import pstats
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.profiling import capture_paths, list_captures, load_capture
+
+
+class Command(BaseCommand):
+    help = ('Показывает сохранённые профили запросов: список, сводку по '
+            'представлениям или подробности одного профиля.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', help='Фильтр по имени представления.')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--summary',
+            action='store_true',
+            help='Сводка по представлениям вместо списка.'
+        )
+        parser.add_argument('--show', help='Идентификатор профиля.')
+        parser.add_argument(
+            '--sort',
+            default='cumulative',
+            help='Ключ сортировки функций для --show.'
+        )
+        parser.add_argument('--top', type=int, default=25)
+
+    def handle(self, *args, **options):
+        if options['show']:
+            return self.show(options['show'], options['sort'],
+                             options['top'])
+        captures = [
+            capture for capture in list_captures()
+            if not options['view'] or options['view'] in (
+                capture['view'] or '')
+        ]
+        if not captures:
+            self.stdout.write('Профилей нет')
+            return
+        if options['summary']:
+            return self.summary(captures)
+        for capture in captures[:options['limit']]:
+            self.stdout.write(
+                f'{capture["id"]}  {capture["method"]:<6} '
+                f'{capture["status"]} {capture["duration"] * 1000:8.1f} мс '
+                f'запросов {len(capture["statements"]):<4} '
+                f'{capture["view"]} {capture["path"]}'
+            )
+
+    def summary(self, captures):
+        groups = defaultdict(list)
+        for capture in captures:
+            groups[capture['view']].append(capture)
+        for view, items in sorted(groups.items(), key=lambda item: -sum(
+                capture['duration'] for capture in item[1])):
+            count = len(items)
+            durations = sorted(capture['duration'] for capture in items)
+            self.stdout.write(
+                f'{view}: профилей {count}, среднее '
+                f'{sum(durations) / count * 1000:.1f} мс, максимум '
+                f'{durations[-1] * 1000:.1f} мс, запросов в среднем '
+                f'{sum(len(c["statements"]) for c in items) / count:.1f}, '
+                f'база {sum(c["db_time"] for c in items) / count * 1000:.1f}'
+                f' мс'
+            )
+
+    def show(self, capture_id, sort, top):
+        try:
+            capture = load_capture(capture_id)
+        except FileNotFoundError:
+            raise CommandError(f'Профиль {capture_id} не найден')
+        self.stdout.write(
+            f'{capture["method"]} {capture["path"]} -> {capture["status"]}\n'
+            f'Представление: {capture["view"]}, параметры: '
+            f'{capture["params"]}, {capture["kwargs"]}\n'
+            f'Пользователь: {capture["user"]}, {capture["created"]}\n'
+            f'Время: {capture["duration"] * 1000:.1f} мс, база '
+            f'{capture["db_time"] * 1000:.1f} мс, запросов '
+            f'{len(capture["statements"])}'
+        )
+        output = io.StringIO()
+        stats = pstats.Stats(capture_paths(capture_id)[1], stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+        self.stdout.write(output.getvalue())
+        self.stdout.write('Самые медленные SQL-запросы:')
+        for statement in sorted(capture['statements'],
+                                key=lambda item: -item['duration'])[:10]:
+            self.stdout.write(
+                f'{statement["duration"] * 1000:8.2f} мс  '
+                f'{statement["sql"][:200]}'
+            )
+        repeated = [
+            (sql, count) for sql, count in Counter(
+                statement['sql'] for statement in capture['statements']
+            ).most_common() if count > 1
+        ]
+        if repeated:
+            self.stdout.write('Повторяющиеся запросы:')
+            for sql, count in repeated[:10]:
+                self.stdout.write(f'{count:>5} x  {sql[:200]}')
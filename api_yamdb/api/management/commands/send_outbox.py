@@ -0,0 +1,109 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пачками через одно '
+            'почтовое соединение; можно запускать несколько копий.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='После стольких неудач письмо больше не отправляется.'
+        )
+        parser.add_argument(
+            '--lease',
+            type=int,
+            default=300,
+            help='На сколько секунд пачка закрепляется за обработчиком.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма.'
+        )
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.process_batch(
+                options['batch_size'],
+                options['max_attempts'],
+                options['lease']
+            )
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, с ошибкой: {failed}'
+                )
+            if not options['loop']:
+                return
+            if not sent and not failed:
+                time.sleep(options['interval'])
+
+    def claim_batch(self, batch_size, max_attempts, lease):
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(sent_at__isnull=True, next_attempt_at__lte=now,
+                        attempts__lt=max_attempts)
+                .order_by('next_attempt_at')[:batch_size]
+            )
+            OutboxEmail.objects.filter(
+                pk__in=[email.pk for email in emails]
+            ).update(next_attempt_at=now + timedelta(seconds=lease))
+        return emails
+
+    def process_batch(self, batch_size, max_attempts, lease):
+        emails = self.claim_batch(batch_size, max_attempts, lease)
+        if not emails:
+            return 0, 0
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            for email in emails:
+                self.schedule_retry(email, error)
+            return 0, len(emails)
+        sent = []
+        failed = 0
+        with connection:
+            for email in emails:
+                try:
+                    EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.from_email,
+                        to=[email.recipient],
+                        connection=connection
+                    ).send()
+                except Exception as error:
+                    failed += 1
+                    self.schedule_retry(email, error)
+                else:
+                    sent.append(email.pk)
+        OutboxEmail.objects.filter(pk__in=sent).update(
+            sent_at=timezone.now(),
+            attempts=F('attempts') + 1,
+            last_error=''
+        )
+        return len(sent), failed
+
+    def schedule_retry(self, email, error):
+        delay = timedelta(seconds=30 * 2 ** email.attempts)
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=timezone.now() + delay,
+            last_error=repr(error)
+        )
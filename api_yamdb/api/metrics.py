@@ -0,0 +1,244 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .permissions import IsAdmin
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+FLUSH_INTERVAL = 1.0
+
+_local = threading.local()
+_lock = threading.Lock()
+_views = {}
+_statuses = {}
+_last_flush = 0.0
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+
+@contextmanager
+def serializer_span():
+    timings = getattr(_local, 'timings', None)
+    if timings is None or timings.serializer_depth:
+        yield
+        return
+    timings.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serializer += time.perf_counter() - started
+        timings.serializer_depth -= 1
+
+
+def get_view_name(request, view_func):
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'unknown')
+    method = request.method.lower()
+    action = getattr(view_func, 'actions', {}).get(method, method)
+    return f'{cls.__name__}.{action}'
+
+
+def observe(buckets, counts, value):
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            counts[index] += 1
+
+
+def record(view, status, total, timings):
+    with _lock:
+        stats = _views.get(view)
+        if stats is None:
+            stats = _views[view] = {
+                'count': 0,
+                'latency': [0] * len(LATENCY_BUCKETS),
+                'latency_sum': 0.0,
+                'queries': [0] * len(QUERY_BUCKETS),
+                'queries_sum': 0,
+                'db_sum': 0.0,
+                'serializer_sum': 0.0,
+            }
+        stats['count'] += 1
+        stats['latency_sum'] += total
+        stats['queries_sum'] += timings.queries
+        stats['db_sum'] += timings.db
+        stats['serializer_sum'] += timings.serializer
+        observe(LATENCY_BUCKETS, stats['latency'], total)
+        observe(QUERY_BUCKETS, stats['queries'], timings.queries)
+        key = f'{view}|{status // 100}xx'
+        _statuses[key] = _statuses.get(key, 0) + 1
+    flush()
+
+
+def snapshot():
+    with _lock:
+        return json.loads(json.dumps({'views': _views,
+                                      'statuses': _statuses}))
+
+
+def flush(force=False):
+    global _last_flush
+    directory = getattr(settings, 'METRICS_DIR', None)
+    now = time.monotonic()
+    if not directory or (not force and now - _last_flush < FLUSH_INTERVAL):
+        return
+    _last_flush = now
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+    with open(f'{path}.tmp', 'w') as output:
+        json.dump(snapshot(), output)
+    os.replace(f'{path}.tmp', path)
+
+
+def merge(target, source):
+    for view, stats in source['views'].items():
+        merged = target['views'].get(view)
+        if merged is None:
+            target['views'][view] = stats
+            continue
+        for key, value in stats.items():
+            if isinstance(value, list):
+                merged[key] = [left + right
+                               for left, right in zip(merged[key], value)]
+            else:
+                merged[key] += value
+    for key, value in source['statuses'].items():
+        target['statuses'][key] = target['statuses'].get(key, 0) + value
+
+
+def collect():
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return snapshot()
+    flush(force=True)
+    result = {'views': {}, 'statuses': {}}
+    for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+        try:
+            with open(path) as source:
+                merge(result, json.load(source))
+        except (OSError, ValueError):
+            continue
+    return result
+
+
+def render_prometheus(data):
+    lines = [
+        '# TYPE yamdb_request_duration_seconds histogram',
+    ]
+    for view, stats in sorted(data['views'].items()):
+        label = f'view="{view}"'
+        for bound, count in zip(LATENCY_BUCKETS, stats['latency']):
+            lines.append(f'yamdb_request_duration_seconds_bucket'
+                         f'{{{label},le="{bound}"}} {count}')
+        lines += [
+            f'yamdb_request_duration_seconds_bucket{{{label},le="+Inf"}} '
+            f'{stats["count"]}',
+            f'yamdb_request_duration_seconds_sum{{{label}}} '
+            f'{stats["latency_sum"]:.6f}',
+            f'yamdb_request_duration_seconds_count{{{label}}} '
+            f'{stats["count"]}',
+        ]
+    lines.append('# TYPE yamdb_request_queries histogram')
+    for view, stats in sorted(data['views'].items()):
+        label = f'view="{view}"'
+        for bound, count in zip(QUERY_BUCKETS, stats['queries']):
+            lines.append(f'yamdb_request_queries_bucket'
+                         f'{{{label},le="{bound}"}} {count}')
+        lines += [
+            f'yamdb_request_queries_bucket{{{label},le="+Inf"}} '
+            f'{stats["count"]}',
+            f'yamdb_request_queries_sum{{{label}}} {stats["queries_sum"]}',
+            f'yamdb_request_queries_count{{{label}}} {stats["count"]}',
+        ]
+    for metric, key in (('db', 'db_sum'), ('serializer', 'serializer_sum')):
+        lines.append(f'# TYPE yamdb_request_{metric}_seconds_total counter')
+        lines += [
+            f'yamdb_request_{metric}_seconds_total{{view="{view}"}} '
+            f'{stats[key]:.6f}'
+            for view, stats in sorted(data['views'].items())
+        ]
+    lines.append('# TYPE yamdb_responses_total counter')
+    for key, count in sorted(data['statuses'].items()):
+        view, status = key.split('|')
+        lines.append(
+            f'yamdb_responses_total{{view="{view}",status="{status}"}} '
+            f'{count}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+class PerformanceMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        _local.timings = timings
+        request.metrics_view = None
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _local.timings = None
+        total = time.perf_counter() - started
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+            f'serializer;dur={timings.serializer * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        if request.metrics_view:
+            record(request.metrics_view, response.status_code, total, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = get_view_name(request, view_func)
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdmin,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(render_prometheus(collect()))
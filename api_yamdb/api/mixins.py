@@ -1,4 +1,15 @@
+from django.http import Http404
 from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from reviews.models import Review, Title
+
+from .metrics import serializer_span
+from .pagination import PubDateCursorPagination
+from .serializers import FIELDS_PARAM, SectionStatsSerializer, get_field_list
 
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin,
@@ -6,3 +17,123 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class SectionStatsMixin:
+
+    @action(detail=False, methods=('GET',))
+    def stats(self, request):
+        queryset = self.filter_queryset(
+            self.get_queryset()
+        ).select_related('stats')
+        page = self.paginate_queryset(queryset)
+        serializer = SectionStatsSerializer(
+            queryset if page is None else page, many=True
+        )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+
+class OptionalCursorPaginationMixin:
+    cursor_pagination_class = PubDateCursorPagination
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            mode = self.request.query_params.get(self.pagination_query_param)
+            if mode == 'cursor':
+                self._paginator = self.cursor_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
+
+
+class NestedResourceMixin:
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            if hasattr(self, '_review'):
+                self._title = self._review.title
+            else:
+                self._title = get_object_or_404(
+                    Title, pk=self.kwargs.get('title_id')
+                )
+        return self._title
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+            self._title = self._review.title
+        return self._review
+
+
+class SparseFieldsViewMixin:
+    sparse_fields = {}
+    sparse_required = ('id',)
+    sparse_select_related = ()
+    sparse_prefetch_related = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = get_field_list(self.request, FIELDS_PARAM)
+        if fields is None or self.action not in ('list', 'retrieve'):
+            return queryset
+        columns = list(self.sparse_required)
+        for name in fields & set(self.sparse_fields):
+            columns.extend(self.sparse_fields[name])
+        queryset = queryset.select_related(None).prefetch_related(None)
+        select = [name for name in self.sparse_select_related
+                  if name in fields]
+        if select:
+            queryset = queryset.select_related(*select)
+        prefetch = [name for name in self.sparse_prefetch_related
+                    if name in fields]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only(*columns)
+
+
+class FastReadMixin:
+    fast_read_values = ()
+    fast_representation = None
+
+    def use_fast_read(self):
+        return (get_field_list(self.request, FIELDS_PARAM) is None
+                and not isinstance(self.paginator, CursorPagination))
+
+    def get_fast_queryset(self):
+        return self.filter_queryset(
+            self.get_queryset()
+        ).prefetch_related(None).values(*self.fast_read_values)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_read():
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_fast_queryset()
+        page = self.paginate_queryset(queryset)
+        with serializer_span():
+            data = self.fast_representation(
+                queryset if page is None else page
+            )
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_fast_read():
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = self.get_fast_queryset().order_by().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )[:1]
+        if not rows:
+            raise Http404
+        with serializer_span():
+            data = self.fast_representation(rows)[0]
+        return Response(data)
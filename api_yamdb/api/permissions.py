@@ -37,5 +37,5 @@ class UserModeratorAdminOrReadOnly(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in permissions.SAFE_METHODS
-                or obj.author == request.user or request.user.is_admin
+                or obj.author_id == request.user.id or request.user.is_admin
                 or request.user.is_moderator)
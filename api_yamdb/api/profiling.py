@@ -0,0 +1,159 @@
+import cProfile
+import glob
+import json
+import os
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from .authentication import ClaimsJWTAuthentication
+from .metrics import get_view_name
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+MAX_STATEMENTS = 1000
+
+
+class StatementLog:
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.statements) < MAX_STATEMENTS:
+                self.statements.append({
+                    'sql': sql,
+                    'params': repr(params)[:500],
+                    'many': many,
+                    'alias': context['connection'].alias,
+                    'duration': time.perf_counter() - started,
+                })
+
+
+def get_directory():
+    return settings.PROFILER_DIR
+
+
+def capture_paths(capture_id):
+    base = os.path.join(get_directory(), capture_id)
+    return f'{base}.json', f'{base}.prof'
+
+
+def rotate():
+    paths = sorted(glob.glob(os.path.join(get_directory(), '*.json')))
+    for path in paths[:max(len(paths) - settings.PROFILER_MAX_FILES, 0)]:
+        for stale in capture_paths(os.path.basename(path)[:-5]):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def save_capture(capture, profiler):
+    os.makedirs(get_directory(), exist_ok=True)
+    meta_path, stats_path = capture_paths(capture['id'])
+    profiler.dump_stats(stats_path)
+    with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as output:
+        json.dump(capture, output, ensure_ascii=False)
+    os.replace(f'{meta_path}.tmp', meta_path)
+    rotate()
+
+
+def load_capture(capture_id):
+    meta_path, _ = capture_paths(capture_id)
+    with open(meta_path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def list_captures():
+    captures = []
+    for path in sorted(glob.glob(os.path.join(get_directory(), '*.json')),
+                       reverse=True):
+        try:
+            with open(path, encoding='utf-8') as source:
+                captures.append(json.load(source))
+        except (OSError, ValueError):
+            continue
+    return captures
+
+
+class ProfilerMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile_view = None
+        if not self.requested(request) or not self.sampled():
+            return self.get_response(request)
+        user = self.get_admin(request)
+        if user is None:
+            return self.get_response(request)
+        return self.profile(request, user)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.profile_view = get_view_name(request, view_func)
+        request.profile_kwargs = {
+            key: str(value) for key, value in view_kwargs.items()
+        }
+
+    def requested(self, request):
+        return (request.META.get(PROFILE_HEADER, '') not in ('', '0')
+                or request.GET.get(PROFILE_PARAM, '0') != '0')
+
+    def sampled(self):
+        return random.random() < settings.PROFILER_SAMPLE_RATE
+
+    def get_admin(self, request):
+        try:
+            result = ClaimsJWTAuthentication().authenticate(request)
+        except APIException:
+            return None
+        if result is None or not result[0].is_admin:
+            return None
+        return result[0]
+
+    def profile(self, request, user):
+        statements = StatementLog()
+        profiler = cProfile.Profile()
+        created = timezone.now()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(statements))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+        capture_id = (f'{created:%Y%m%d%H%M%S%f}-'
+                      f'{uuid.uuid4().hex[:8]}')
+        save_capture({
+            'id': capture_id,
+            'created': created.isoformat(),
+            'user': user.username,
+            'method': request.method,
+            'path': request.path,
+            'view': request.profile_view,
+            'params': {key: values for key, values in request.GET.lists()
+                       if key != PROFILE_PARAM},
+            'kwargs': getattr(request, 'profile_kwargs', {}),
+            'status': response.status_code,
+            'duration': duration,
+            'db_time': sum(item['duration']
+                           for item in statements.statements),
+            'statements': statements.statements,
+        }, profiler)
+        response['X-Profile-Id'] = capture_id
+        return response
@@ -0,0 +1,68 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from reviews.models import Title
+
+TITLE_VALUES = ('id', 'name', 'year', 'rating_sum', 'rating_count',
+                'description', 'category__name', 'category__slug')
+REVIEW_VALUES = ('id', 'text', 'author__username', 'score', 'pub_date')
+COMMENT_VALUES = ('id', 'text', 'author__username', 'pub_date')
+
+date_field = serializers.DateTimeField()
+
+
+def represent_titles(rows):
+    rows = list(rows)
+    genres = defaultdict(list)
+    links = Title.genre.through.objects.filter(
+        title_id__in=[row['id'] for row in rows]
+    ).order_by('genre__name').values_list(
+        'title_id', 'genre__name', 'genre__slug'
+    )
+    for title_id, name, slug in links:
+        genres[title_id].append({'name': name, 'slug': slug})
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': (row['rating_sum'] // row['rating_count']
+                       if row['rating_count'] else None),
+            'description': row['description'],
+            'genre': genres[row['id']],
+            'category': (
+                {'name': row['category__name'],
+                 'slug': row['category__slug']}
+                if row['category__slug'] is not None else None
+            ),
+        }
+        for row in rows
+    ]
+
+
+def represent_reviews(rows):
+    to_date = date_field.to_representation
+    return [
+        {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': to_date(row['pub_date']),
+        }
+        for row in rows
+    ]
+
+
+def represent_comments(rows):
+    to_date = date_field.to_representation
+    return [
+        {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': to_date(row['pub_date']),
+        }
+        for row in rows
+    ]
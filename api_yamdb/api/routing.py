@@ -0,0 +1,101 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+PIN_KEY = 'db:pin:{}'
+
+_local = threading.local()
+
+
+def get_replicas():
+    return [alias for alias in settings.DATABASES
+            if alias != DEFAULT_DB_ALIAS]
+
+
+@contextmanager
+def read_from_primary():
+    previous = getattr(_local, 'alias', None)
+    _local.alias = None
+    try:
+        yield
+    finally:
+        _local.alias = previous
+
+
+@contextmanager
+def primary_if_modified(timestamp):
+    if timestamp is not None and (
+            time.time() - timestamp <= settings.REPLICA_PIN_SECONDS):
+        with read_from_primary():
+            yield
+    else:
+        yield
+
+
+def pin_to_primary(user_id):
+    cache.set(PIN_KEY.format(user_id), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return cache.get(PIN_KEY.format(user_id)) is not None
+
+
+def get_user_id(request):
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except APIException:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return getattr(_local, 'alias', None)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = get_replicas()
+
+    def __call__(self, request):
+        if not self.replicas:
+            return self.get_response(request)
+        user_id = get_user_id(request)
+        safe = request.method in SAFE_METHODS
+        if safe and not (user_id and is_pinned(user_id)):
+            _local.alias = random.choice(self.replicas)
+        try:
+            response = self.get_response(request)
+        finally:
+            _local.alias = None
+        if not safe and user_id and response.status_code < 400:
+            pin_to_primary(user_id)
+        return response
@@ -1,9 +1,48 @@
 from django.forms import ValidationError
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.validators import UniqueValidator
 
-from reviews.models import User, Category, Genre, Title, Review, Comment
+from reviews.models import (User, Category, Genre, Title, TitleRanking,
+                            Review, Comment, ScoreHistogram)
+
+from .metrics import serializer_span
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def get_field_list(request, param):
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class TimedRepresentationMixin:
+
+    def to_representation(self, instance):
+        with serializer_span():
+            return super().to_representation(instance)
+
+
+class SparseFieldsMixin:
+    collapsed_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields = get_field_list(request, FIELDS_PARAM)
+        if fields is None:
+            return
+        expand = get_field_list(request, EXPAND_PARAM) or set()
+        for name in list(self.fields):
+            if name not in fields:
+                self.fields.pop(name)
+            elif name in self.collapsed_fields and name not in expand:
+                self.fields[name] = self.collapsed_fields[name]()
 
 
 class CodeSerializer(serializers.Serializer):
@@ -18,7 +57,7 @@ class CodeSerializer(serializers.Serializer):
         ]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     bio = serializers.CharField(required=False)
 
     class Meta:
@@ -54,7 +93,8 @@ class SignUpSerializer(serializers.Serializer):
         return value
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedRepresentationMixin, SparseFieldsMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -67,8 +107,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         if self.context.get('request').method != 'POST':
             return data
         author = self.context['request'].user.id
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
+        title = self.context['view'].get_title()
         if Review.objects.filter(title=title, author=author).exists():
             raise ValidationError(
                 'Вы уже оставили Ваш отзыв!'
@@ -76,7 +115,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedRepresentationMixin, SparseFieldsMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -86,19 +126,20 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedRepresentationMixin,
+                         serializers.ModelSerializer):
     class Meta:
         model = Category
         exclude = ('id',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         exclude = ('id',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         queryset=Genre.objects.all(), slug_field='slug', many=True
     )
@@ -112,12 +153,108 @@ class TitleSerializer(serializers.ModelSerializer):
                   'genre', 'category')
 
 
-class ReadTitleSerializer(serializers.ModelSerializer):
+class BulkTitleSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False, min_value=1)
+    genre = serializers.ListField(
+        child=serializers.SlugField(), required=False
+    )
+    category = serializers.SlugField(required=False, allow_null=True)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+
+
+class ReadTitleSerializer(TimedRepresentationMixin, SparseFieldsMixin,
+                          serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
 
+    collapsed_fields = {
+        'genre': lambda: serializers.SlugRelatedField(
+            read_only=True, many=True, slug_field='slug'
+        ),
+        'category': lambda: serializers.SlugRelatedField(
+            read_only=True, slug_field='slug'
+        ),
+    }
+
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'rating', 'description',
                   'genre', 'category')
+
+
+class BulkModerationSerializer(serializers.Serializer):
+    LIMIT = 500
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=LIMIT
+    )
+    author = serializers.CharField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise ValidationError(
+                'Укажите ids или фильтр: author, since, until'
+            )
+        return data
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    LIMIT = 100
+
+    genre = serializers.SlugField(required=False)
+    category = serializers.SlugField(required=False)
+    min_reviews = serializers.IntegerField(min_value=1, default=3)
+    limit = serializers.IntegerField(min_value=1, max_value=LIMIT, default=10)
+
+    def validate(self, data):
+        if 'genre' in data and 'category' in data:
+            raise ValidationError('Укажите либо жанр, либо категорию')
+        return data
+
+
+class TitleRankingSerializer(TimedRepresentationMixin,
+                             serializers.ModelSerializer):
+    id = serializers.IntegerField(source='title_id')
+    name = serializers.CharField(source='title.name')
+    year = serializers.IntegerField(source='title.year')
+    rating = serializers.IntegerField()
+
+    class Meta:
+        model = TitleRanking
+        fields = ('id', 'name', 'year', 'rating', 'review_count')
+
+
+class SectionStatsSerializer(TimedRepresentationMixin,
+                             serializers.Serializer):
+    name = serializers.CharField()
+    slug = serializers.SlugField()
+    title_count = serializers.IntegerField(source='stats.title_count')
+    review_count = serializers.IntegerField(source='stats.review_count')
+    average_score = serializers.FloatField(source='stats.average_score')
+
+
+class ScoreHistogramSerializer(TimedRepresentationMixin,
+                               serializers.ModelSerializer):
+    id = serializers.IntegerField(source='title_id')
+    total = serializers.SerializerMethodField()
+    scores = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ScoreHistogram
+        fields = ('id', 'total', 'scores')
+
+    def get_total(self, obj):
+        return sum(obj.counts)
+
+    def get_scores(self, obj):
+        return {str(score): count
+                for score, count in zip(obj.SCORES, obj.counts)}
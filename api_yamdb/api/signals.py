@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import in_bulk_title_writes
+
+from .authentication import forget_token_version
+from .cache import TITLE_SECTIONS, bump_version_on_commit, title_namespace
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    bump_version_on_commit('categories', 'titles', TITLE_SECTIONS)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    bump_version_on_commit('genres', 'titles', TITLE_SECTIONS)
+
+
+@receiver(post_save, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    if in_bulk_title_writes():
+        return
+    bump_version_on_commit('titles', title_namespace(instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_version_on_commit('titles', title_namespace(instance.pk))
+    elif pk_set:
+        bump_version_on_commit(
+            'titles', *(title_namespace(pk) for pk in pk_set)
+        )
+    else:
+        bump_version_on_commit('titles', TITLE_SECTIONS)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    bump_version_on_commit(
+        'titles', title_namespace(instance.pk), f'reviews:{instance.pk}'
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    bump_version_on_commit(
+        'titles', title_namespace(instance.title_id),
+        f'reviews:{instance.title_id}'
+    )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    bump_version_on_commit(
+        'titles', title_namespace(instance.title_id),
+        f'reviews:{instance.title_id}', f'comments:{instance.pk}'
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_version_on_commit(f'comments:{instance.review_id}')
+
+
+@receiver(post_save, sender=User)
+def username_changed(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if created or loaded is None or loaded == instance.username:
+        return
+    title_ids = Review.objects.filter(author=instance).order_by().values_list(
+        'title_id', flat=True
+    ).distinct()
+    review_ids = Comment.objects.filter(
+        author=instance
+    ).order_by().values_list('review_id', flat=True).distinct()
+    bump_version_on_commit(
+        *(f'reviews:{pk}' for pk in title_ids),
+        *(f'comments:{pk}' for pk in review_ids)
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: forget_token_version(instance.pk))
@@ -0,0 +1,98 @@
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import BaseDatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_KEY = 'throttle:{}:{}:{}'
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# incr() этих бэкендов — чтение и запись отдельными операциями: воркеры
+# теряют друг у друга запросы, а каждая проверка ходит в базу или на диск.
+NON_ATOMIC_CACHES = (BaseDatabaseCache, FileBasedCache)
+
+
+def parse_rate(rate):
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    kind = None
+
+    def __init__(self):
+        if isinstance(caches['default'], NON_ATOMIC_CACHES):
+            raise ImproperlyConfigured(
+                'Ограничение частоты запросов требует кеша с атомарным '
+                'incr: memcached или LocMemCache для одного процесса'
+            )
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return None, None
+        scope = f'{scope}.{self.kind}'
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        return scope, rate and parse_rate(rate)
+
+    def allow_request(self, request, view):
+        methods = getattr(view, 'throttle_methods', None)
+        if methods is not None and request.method not in methods:
+            return True
+        scope, rate = self.get_rate(view)
+        if rate is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        self.limit, self.duration = rate
+        now = time.time()
+        window = int(now // self.duration)
+        current_key = THROTTLE_KEY.format(scope, ident, window)
+        cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.current = cache.incr(current_key)
+        except ValueError:
+            cache.set(current_key, 1, self.duration * 2)
+            self.current = 1
+        self.previous = cache.get(
+            THROTTLE_KEY.format(scope, ident, window - 1), 0
+        )
+        self.elapsed = now - window * self.duration
+        weight = 1 - self.elapsed / self.duration
+        return self.previous * weight + self.current <= self.limit
+
+    def wait(self):
+        if self.current > self.limit:
+            return (self.duration - self.elapsed
+                    + self.duration * (1 - self.limit / self.current))
+        free = (self.limit - self.current) / self.previous
+        return max(self.duration * (1 - free) - self.elapsed, 0)
+
+
+class IPWindowThrottle(SlidingWindowThrottle):
+    kind = 'ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UserWindowThrottle(SlidingWindowThrottle):
+    kind = 'user'
+
+    def get_ident_key(self, request, view):
+        if not request.user.is_authenticated:
+            return None
+        return request.user.pk
+
+
+class EndpointWindowThrottle(SlidingWindowThrottle):
+    kind = 'endpoint'
+
+    def get_ident_key(self, request, view):
+        return 'all'
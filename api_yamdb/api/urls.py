@@ -1,6 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .export import ExportView
+from .health import ReadinessView
+from .metrics import MetricsView
 from .views import (CommentsViewSet,
                     ReviewsViewSet,
                     UserViewSet,
@@ -8,7 +11,8 @@ from .views import (CommentsViewSet,
                     GetToken,
                     CategoryViewSet,
                     GenreViewSet,
-                    TitleViewSet
+                    TitleViewSet,
+                    ModerationViewSet
                     )
 
 router_v1 = DefaultRouter()
@@ -21,9 +25,13 @@ router_v1.register(
 router_v1.register('categories', CategoryViewSet)
 router_v1.register('genres', GenreViewSet)
 router_v1.register('titles', TitleViewSet)
+router_v1.register('moderation', ModerationViewSet, basename='moderation')
 
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/token/', GetToken.as_view()),
-    path('v1/auth/signup/', SignUp.as_view())
+    path('v1/auth/signup/', SignUp.as_view()),
+    path('v1/export/<slug:name>/', ExportView.as_view()),
+    path('v1/metrics/', MetricsView.as_view()),
+    path('v1/ready/', ReadinessView.as_view())
 ]
@@ -1,5 +1,5 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import connection, transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets, permissions
 from rest_framework.decorators import action
@@ -9,15 +9,33 @@ from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
-from reviews.models import User, Category, Genre, Title, Review
+from reviews.models import (User, Category, Genre, Title, TitleRanking,
+                            Review, Comment, ScoreHistogram)
+from reviews.rankings import rebuild_rankings
+from reviews.stats import recount_stats
+from reviews.signals import bulk_title_writes, deferred_ratings
 
+from .authentication import access_token_for
+from .cache import (TITLE_SECTIONS, CachedResponseMixin,
+                    ConditionalGetMixin, bump_version_on_commit,
+                    title_namespace)
 from .filters import TitleFilter
-from .mixins import CreateListDestroyViewSet
+from .mixins import (CreateListDestroyViewSet, FastReadMixin,
+                     NestedResourceMixin, OptionalCursorPaginationMixin,
+                     SectionStatsMixin, SparseFieldsViewMixin)
+from .models import OutboxEmail
 from .permissions import IsAdmin, AdminOrReadOnly, UserModeratorAdminOrReadOnly
+from .representations import (COMMENT_VALUES, REVIEW_VALUES, TITLE_VALUES,
+                              represent_comments, represent_reviews,
+                              represent_titles)
 from .serializers import (
+    BulkModerationSerializer,
+    BulkTitleSerializer,
+    LeaderboardQuerySerializer,
+    ScoreHistogramSerializer,
+    TitleRankingSerializer,
     SignUpSerializer,
     CodeSerializer,
     UserSerializer,
@@ -32,23 +50,25 @@ from .serializers import (
 
 class SignUp(APIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         if serializer.is_valid(raise_exception=True):
             username = serializer.data.get('username')
             email = serializer.data.get('email')
-            user = User.objects.create(
-                username=username,
-                email=email
-            )
-            token = default_token_generator.make_token(user)
-            send_mail(
-                subject='Приветствуем на API YAMDB!',
-                message=f'Токен для авторизации: {token}',
-                from_email=DEFAULT_FROM_EMAIL,
-                recipient_list=[email]
-            )
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=username,
+                    email=email
+                )
+                token = default_token_generator.make_token(user)
+                OutboxEmail.objects.create(
+                    subject='Приветствуем на API YAMDB!',
+                    message=f'Токен для авторизации: {token}',
+                    from_email=DEFAULT_FROM_EMAIL,
+                    recipient=email
+                )
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK
@@ -58,6 +78,7 @@ class SignUp(APIView):
 
 class GetToken(APIView):
     permission_classes = (AllowAny,)
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = CodeSerializer(data=request.data)
@@ -68,7 +89,7 @@ class GetToken(APIView):
         )
         confirmation_code = serializer.data.get('confirmation_code')
         if default_token_generator.check_token(user, confirmation_code):
-            token = AccessToken.for_user(user)
+            token = access_token_for(user)
             return Response(
                 {'Ваш токен доступа к API': str(token)},
                 status=status.HTTP_200_OK
@@ -87,6 +108,10 @@ class UserViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     pagination_class = LimitOffsetPagination
 
+    def perform_destroy(self, instance):
+        with transaction.atomic(), deferred_ratings():
+            instance.delete()
+
     @action(
         detail=False,
         methods=('GET', 'PATCH',),
@@ -115,7 +140,9 @@ class UserViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CachedResponseMixin, SectionStatsMixin,
+                      CreateListDestroyViewSet):
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter,)
@@ -124,7 +151,9 @@ class CategoryViewSet(CreateListDestroyViewSet):
     permission_classes = (AdminOrReadOnly,)
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedResponseMixin, SectionStatsMixin,
+                   CreateListDestroyViewSet):
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     filter_backends = (filters.SearchFilter,)
@@ -133,49 +162,279 @@ class GenreViewSet(CreateListDestroyViewSet):
     permission_classes = (AdminOrReadOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   SparseFieldsViewMixin, FastReadMixin,
+                   viewsets.ModelViewSet):
+    cache_namespace = 'titles'
+    fast_read_values = TITLE_VALUES
+    fast_representation = staticmethod(represent_titles)
+    sparse_fields = {
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'rating': ('rating_sum', 'rating_count'),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+    sparse_select_related = ('category',)
+    sparse_prefetch_related = ('genre',)
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     serializer_class = TitleSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = (AdminOrReadOnly,)
+    lookup_value_regex = r'\d+'
+
+    bulk_limit = 5000
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return TitleSerializer
         return ReadTitleSerializer
 
+    def get_cache_namespace(self):
+        if self.action == 'retrieve':
+            return (title_namespace(self.kwargs[self.lookup_field]),
+                    TITLE_SECTIONS)
+        return super().get_cache_namespace()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic(), deferred_ratings():
+            instance.delete()
+
+    @action(detail=False, methods=('POST',))
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError('Ожидается список произведений')
+        if len(request.data) > self.bulk_limit:
+            raise ValidationError(
+                f'Не больше {self.bulk_limit} произведений за запрос'
+            )
+        errors = {}
+        items = {}
+        for index, item in enumerate(request.data):
+            serializer = BulkTitleSerializer(
+                data=item, partial=isinstance(item, dict) and 'id' in item
+            )
+            if serializer.is_valid():
+                items[index] = serializer.validated_data
+            else:
+                errors[index] = serializer.errors
+        genres = dict(Genre.objects.filter(slug__in={
+            slug for item in items.values() for slug in item.get('genre', ())
+        }).values_list('slug', 'pk'))
+        categories = dict(Category.objects.filter(slug__in={
+            item['category'] for item in items.values()
+            if item.get('category')
+        }).values_list('slug', 'pk'))
+        existing = Title.objects.in_bulk(
+            [item['id'] for item in items.values() if 'id' in item]
+        )
+        new, updated, links = {}, {}, {}
+        for index, item in items.items():
+            item_errors = {}
+            unknown = [slug for slug in item.get('genre', ())
+                       if slug not in genres]
+            if unknown:
+                item_errors['genre'] = [f'Жанры не найдены: {unknown}']
+            category = item.get('category')
+            if category and category not in categories:
+                item_errors['category'] = [f'Категория {category} не найдена']
+            if 'id' in item and item['id'] not in existing:
+                item_errors['id'] = ['Произведение не найдено']
+            if item_errors:
+                errors[index] = item_errors
+                continue
+            title = existing.get(item.get('id')) or Title()
+            for field in ('name', 'year', 'description'):
+                if field in item:
+                    setattr(title, field, item[field])
+            if 'category' in item:
+                title.category_id = categories.get(category)
+            (updated if title.pk else new)[index] = title
+            if 'genre' in item or not title.pk:
+                links[index] = [genres[slug] for slug in item.get('genre', ())]
+        with transaction.atomic():
+            if connection.features.can_return_ids_from_bulk_insert:
+                Title.objects.bulk_create(new.values())
+            else:
+                with bulk_title_writes():
+                    for title in new.values():
+                        title.save()
+            Title.objects.bulk_update(
+                updated.values(),
+                ('name', 'year', 'description', 'category')
+            )
+            Through = Title.genre.through
+            relinked = Through.objects.filter(title_id__in=[
+                updated[index].pk for index in links if index in updated
+            ])
+            genre_ids = set(relinked.values_list('genre_id', flat=True))
+            relinked.delete()
+            by_index = {**new, **updated}
+            Through.objects.bulk_create(
+                Through(title_id=by_index[index].pk, genre_id=genre_id)
+                for index, linked_ids in links.items()
+                for genre_id in linked_ids
+            )
+            rebuild_rankings([title.pk for title in updated.values()])
+            recount_stats(
+                genre_ids=genre_ids | {
+                    genre_id for ids in links.values() for genre_id in ids
+                },
+                category_ids={
+                    title.category_id for title in by_index.values()
+                } | {getattr(title, '_loaded_category_id', None)
+                     for title in updated.values()}
+            )
+            bump_version_on_commit('titles', *(
+                title_namespace(title.pk) for title in updated.values()
+            ))
+        return Response(
+            {
+                'created': [title.pk for title in new.values()],
+                'updated': [title.pk for title in updated.values()],
+                'errors': [{'index': index, 'errors': errors[index]}
+                           for index in sorted(errors)],
+            },
+            status=(status.HTTP_400_BAD_REQUEST if errors and not items
+                    else status.HTTP_200_OK)
+        )
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=('GET',))
+    def top(self, request):
+        query = LeaderboardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        data = query.validated_data
+        scope = TitleRanking.OVERALL
+        if 'genre' in data:
+            scope = TitleRanking.genre_scope(
+                get_object_or_404(Genre, slug=data['genre']).pk
+            )
+        elif 'category' in data:
+            scope = TitleRanking.category_scope(
+                get_object_or_404(Category, slug=data['category']).pk
+            )
+        rankings = TitleRanking.objects.filter(
+            scope=scope, review_count__gte=data['min_reviews']
+        ).select_related('title').only(
+            'rating', 'review_count', 'title__name', 'title__year'
+        ).order_by('-rating', '-review_count', 'title_id')[:data['limit']]
+        return Response(TitleRankingSerializer(rankings, many=True).data)
+
+    @action(detail=True, methods=('GET',))
+    def scores(self, request, pk=None):
+        histogram = ScoreHistogram.objects.filter(
+            title_id=pk
+        ).order_by('title_id').first()
+        if histogram is None:
+            histogram = ScoreHistogram(
+                title=get_object_or_404(Title.objects.only('pk'), pk=pk)
+            )
+        return Response(ScoreHistogramSerializer(histogram).data)
+
+
+class ReviewsViewSet(ConditionalGetMixin, OptionalCursorPaginationMixin,
+                     NestedResourceMixin, SparseFieldsViewMixin,
+                     FastReadMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (UserModeratorAdminOrReadOnly,)
+    throttle_scope = 'reviews'
+    throttle_methods = ('POST',)
+    fast_read_values = REVIEW_VALUES
+    fast_representation = staticmethod(represent_reviews)
+    sparse_fields = {
+        'text': ('text',),
+        'author': ('author', 'author__username'),
+        'score': ('score',),
+    }
+    sparse_required = ('id', 'title', 'pub_date')
+    sparse_select_related = ('author',)
+
+    def get_cache_namespace(self):
+        return f'reviews:{self.kwargs.get("title_id")}'
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        user = self.request.user
-        review = title.reviews.filter(author_id=user.id, title_id=title.id)
-        if review.exists():
-            raise ValidationError('Вы уже оставили Ваш отзыв!')
-        serializer.save(author=user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(ConditionalGetMixin, OptionalCursorPaginationMixin,
+                      NestedResourceMixin, SparseFieldsViewMixin,
+                      FastReadMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (UserModeratorAdminOrReadOnly,)
+    throttle_scope = 'comments'
+    throttle_methods = ('POST',)
+    fast_read_values = COMMENT_VALUES
+    fast_representation = staticmethod(represent_comments)
+    sparse_fields = {
+        'text': ('text',),
+        'author': ('author', 'author__username'),
+    }
+    sparse_required = ('id', 'review', 'pub_date')
+    sparse_select_related = ('author',)
+
+    def get_cache_namespace(self):
+        return f'comments:{self.kwargs.get("review_id")}'
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        review = get_object_or_404(title.reviews,
-                                   pk=self.kwargs.get('review_id'))
-        queryset = review.comments.all()
-        return queryset
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'),
-                                   title_id=self.kwargs.get('title_id'))
-        user = self.request.user
-        serializer.save(author=user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+
+class ModerationViewSet(viewsets.ViewSet):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @action(detail=False, methods=('POST',))
+    def reviews(self, request):
+        return self.bulk_delete(request, Review)
+
+    @action(detail=False, methods=('POST',))
+    def comments(self, request):
+        return self.bulk_delete(request, Comment)
+
+    def bulk_delete(self, request, model):
+        serializer = BulkModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = model.objects.all()
+        if 'ids' in data:
+            queryset = queryset.filter(pk__in=data['ids'])
+        if 'author' in data:
+            queryset = queryset.filter(author__username=data['author'])
+        if 'since' in data:
+            queryset = queryset.filter(pub_date__gte=data['since'])
+        if 'until' in data:
+            queryset = queryset.filter(pub_date__lte=data['until'])
+        user = request.user
+        moderator = user.is_admin or user.is_moderator
+        with transaction.atomic(), deferred_ratings():
+            rows = list(
+                queryset.select_for_update().order_by('pk').values_list(
+                    'pk', 'author_id'
+                )[:serializer.LIMIT + 1]
+            )
+            found = dict(rows[:serializer.LIMIT])
+            allowed = [pk for pk, author_id in found.items()
+                       if moderator or author_id == user.id]
+            model.objects.filter(pk__in=allowed).delete()
+        allowed = set(allowed)
+        results = [
+            {'id': pk, 'status': 'deleted' if pk in allowed else 'forbidden'}
+            for pk in found
+        ]
+        results += [{'id': pk, 'status': 'not_found'}
+                    for pk in dict.fromkeys(data.get('ids', ()))
+                    if pk not in found]
+        return Response(
+            {'deleted': len(allowed),
+             'has_more': len(rows) > serializer.LIMIT,
+             'results': results},
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, SECRET_KEY
+
+SECRET_KEY = os.getenv('SECRET_KEY', SECRET_KEY)
+
+DEBUG = os.getenv('DEBUG', 'False').lower() in ('1', 'true', 'yes')
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '*').split(',')
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', '600'))
+
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_HEALTH_CHECK_INTERVAL', '30'))
+
+# Кеш общий для всех воркеров gunicorn: memcached увеличивает счётчики
+# ограничения частоты и версии кеша атомарно и без обращений к базе.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.memcached.MemcachedCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', '127.0.0.1:11211'),
+    }
+}
+
+if CACHES['default']['BACKEND'].endswith('LocMemCache'):
+    raise ImproperlyConfigured(
+        'LocMemCache не разделяется между воркерами gunicorn: '
+        'версии кеша, отзыв токенов, привязка к основной базе '
+        'и ограничения частоты работали бы в каждом воркере отдельно'
+    )
+
+if CACHES['default']['BACKEND'].endswith(('DatabaseCache', 'FileBasedCache')):
+    raise ImproperlyConfigured(
+        'DatabaseCache и FileBasedCache увеличивают счётчики не атомарно '
+        'и ходят в базу или на диск при каждой проверке ограничения частоты'
+    )
+
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'api_yamdb_metrics')
+)
@@ -25,11 +25,14 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'rest_framework_simplejwt',
     'django_filters',
-    'api',
-    'reviews',
+    'api.apps.ApiConfig',
+    'reviews.apps.ReviewsConfig',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.PerformanceMiddleware',
+    'api.profiling.ProfilerMiddleware',
+    'api.routing.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,8 +73,8 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 #}
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE'),
-        'NAME': os.getenv('DB_NAME'),
+        'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
@@ -79,6 +82,35 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS для PostgreSQL, DB_REPLICA_NAMES
+# для отдельных файлов SQLite. Списки через запятую.
+REPLICA_HOSTS = [host for host in os.getenv('DB_REPLICA_HOSTS', '').split(',')
+                 if host]
+REPLICA_NAMES = [name for name in os.getenv('DB_REPLICA_NAMES', '').split(',')
+                 if name]
+for index in range(max(len(REPLICA_HOSTS), len(REPLICA_NAMES))):
+    DATABASES[f'replica{index + 1}'] = dict(
+        DATABASES['default'],
+        HOST=(REPLICA_HOSTS[index] if index < len(REPLICA_HOSTS)
+              else DATABASES['default']['HOST']),
+        NAME=(REPLICA_NAMES[index] if index < len(REPLICA_NAMES)
+              else DATABASES['default']['NAME']),
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['api.routing.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'api_yamdb'),
+    }
+}
+
 
 # Password validation
 
@@ -122,10 +154,25 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.IPWindowThrottle',
+        'api.throttling.UserWindowThrottle',
+        'api.throttling.EndpointWindowThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup.ip': '10/hour',
+        'signup.endpoint': '300/minute',
+        'token.ip': '30/minute',
+        'token.endpoint': '600/minute',
+        'reviews.ip': '60/minute',
+        'reviews.user': '20/minute',
+        'comments.ip': '120/minute',
+        'comments.user': '30/minute',
+    },
 }
 
 SIMPLE_JWT = {
@@ -133,6 +180,12 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+METRICS_DIR = os.getenv('METRICS_DIR')
+
+PROFILER_DIR = os.getenv('PROFILER_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', '1.0'))
+PROFILER_MAX_FILES = int(os.getenv('PROFILER_MAX_FILES', '200'))
+
 DEFAULT_FROM_EMAIL = 'no-reaply@yamdb.ru'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -0,0 +1,44 @@
+import glob
+import os
+import time
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', len(os.sched_getaffinity(0)) * 2 + 1
+))
+worker_class = 'sync'
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+errorlog = '-'
+
+last_request = {'finished': time.monotonic()}
+
+
+def on_starting(server):
+    from django.conf import settings
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if directory:
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    from django.db import connections
+    connections.close_all()
+
+
+def pre_request(worker, req):
+    from django.conf import settings
+
+    from api.health import check_connections
+    idle = time.monotonic() - last_request['finished']
+    if idle > getattr(settings, 'DB_HEALTH_CHECK_INTERVAL', 30):
+        check_connections()
+
+
+def post_request(worker, req, environ, resp):
+    last_request['finished'] = time.monotonic()
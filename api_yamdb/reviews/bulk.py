@@ -0,0 +1,92 @@
+import csv
+import io
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.color import no_style
+from django.db import connection
+from django.utils import timezone
+
+from .models import User
+
+COPY_NULL = r'\N'
+
+
+def get_defaults(model, fields):
+    defaults = []
+    for field in model._meta.concrete_fields:
+        if field in fields or field.primary_key:
+            continue
+        if model is User and field.name == 'password':
+            value = UNUSABLE_PASSWORD_PREFIX
+        elif model is User and field.name == 'date_joined':
+            value = timezone.now()
+        else:
+            value = field.get_default()
+        defaults.append((field, field.get_db_prep_save(value, connection)))
+    return defaults
+
+
+def prepare(field, value):
+    if value == '' and field.null:
+        return None
+    return field.get_db_prep_save(field.to_python(value), connection)
+
+
+def insert_batch(model, fields, batch):
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields))
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, batch)
+
+
+def copy_batch(model, fields, batch):
+    quote = connection.ops.quote_name
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow(
+            [COPY_NULL if value is None else value for value in row])
+    buffer.seek(0)
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '{}')".format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        COPY_NULL
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+def write_rows(model, names, rows, batch_size):
+    fields = [model._meta.get_field(name) for name in names]
+    defaults = get_defaults(model, fields)
+    fields += [field for field, _ in defaults]
+    extra = [value for _, value in defaults]
+    insert = copy_batch if connection.vendor == 'postgresql' else (
+        insert_batch)
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append([
+            prepare(field, value) for field, value in zip(fields, row)
+        ] + extra)
+        if len(batch) >= batch_size:
+            insert(model, fields, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        insert(model, fields, batch)
+        total += len(batch)
+    return total
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if not statements:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
@@ -0,0 +1,41 @@
+from django.db.models import Count, F, Q
+
+from .models import Review, ScoreHistogram
+
+BATCH_SIZE = 1000
+
+
+def recount_histograms(title_ids=None):
+    histograms = ScoreHistogram.objects.all()
+    reviews = Review.objects.all()
+    if title_ids is not None:
+        histograms = histograms.filter(title_id__in=title_ids)
+        reviews = reviews.filter(title_id__in=title_ids)
+    histograms.delete()
+    rows = [
+        ScoreHistogram(**row) for row in reviews.order_by().values(
+            'title_id'
+        ).annotate(**{
+            ScoreHistogram.field_name(score): Count('pk', filter=Q(
+                score=score
+            ))
+            for score in ScoreHistogram.SCORES
+        })
+    ]
+    for start in range(0, len(rows), BATCH_SIZE):
+        ScoreHistogram.objects.bulk_create(rows[start:start + BATCH_SIZE])
+    return len(rows)
+
+
+def shift_histogram(title_id, deltas):
+    deltas = {score: delta for score, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = ScoreHistogram.objects.filter(title_id=title_id).update(**{
+        ScoreHistogram.field_name(score): F(
+            ScoreHistogram.field_name(score)
+        ) + delta
+        for score, delta in deltas.items()
+    })
+    if not updated and any(delta > 0 for delta in deltas.values()):
+        recount_histograms([title_id])
@@ -0,0 +1,170 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.bulk import reset_sequences, write_rows
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+WORDS = ('тень', 'город', 'ветер', 'песня', 'река', 'ночь', 'звезда',
+         'дорога', 'сад', 'море', 'огонь', 'зима', 'лето', 'дом', 'мост',
+         'shadow', 'river', 'night', 'road', 'garden', 'storm', 'light')
+CATEGORIES = (('Фильм', 'movie'), ('Книга', 'book'), ('Музыка', 'music'),
+              ('Сериал', 'series'), ('Игра', 'game'), ('Спектакль', 'play'),
+              ('Комикс', 'comic'), ('Подкаст', 'podcast'))
+GENRES = 30
+
+
+class Command(BaseCommand):
+    help = ('Создаёт синтетический набор данных заданного масштаба: '
+            'произведения, жанры, отзывы с перекосом популярности, '
+            'комментарии и пользователей разных ролей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Масштаб: 1.0 — это 1000 произведений и 500 пользователей.'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument(
+            '--reviews-per-user',
+            type=float,
+            default=10.0,
+            help='Среднее число отзывов одного пользователя.'
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для популярности произведений.'
+        )
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale должен быть положительным')
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        titles = max(int(1000 * options['scale']), 1)
+        users = max(int(500 * options['scale']), 1)
+        started = time.monotonic()
+        with transaction.atomic():
+            self.generate(titles, users, options)
+        reset_sequences([User, Category, Genre, Title,
+                         Title.genre.through, Review, Comment])
+        call_command('rebuild_ratings', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
+
+    def next_id(self, model):
+        return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+    def write(self, model, names, rows):
+        count = write_rows(model, names, rows, self.batch_size)
+        self.stdout.write(f'{model._meta.db_table}: {count}')
+        return count
+
+    def random_date(self, days=3650):
+        return self.now - timedelta(seconds=self.random.randrange(
+            days * 24 * 3600
+        ))
+
+    def text(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def generate(self, title_count, user_count, options):
+        rnd = self.random
+        user_start = self.next_id(User)
+        user_ids = range(user_start, user_start + user_count)
+        roles = rnd.choices(
+            (User.USER, User.MODERATOR, User.ADMIN), (93, 5, 2),
+            k=user_count
+        )
+        self.write(User, ('id', 'username', 'email', 'role'), (
+            (pk, f'user{pk}', f'user{pk}@yamdb.fake', role)
+            for pk, role in zip(user_ids, roles)
+        ))
+
+        category_start = self.next_id(Category)
+        category_ids = range(category_start,
+                             category_start + len(CATEGORIES))
+        self.write(Category, ('id', 'name', 'slug'), (
+            (pk, name, f'{slug}-{pk}')
+            for pk, (name, slug) in zip(category_ids, CATEGORIES)
+        ))
+        genre_start = self.next_id(Genre)
+        genre_ids = range(genre_start, genre_start + GENRES)
+        self.write(Genre, ('id', 'name', 'slug'), (
+            (pk, f'{self.text(1).capitalize()} {pk}', f'genre-{pk}')
+            for pk in genre_ids
+        ))
+
+        title_start = self.next_id(Title)
+        title_ids = range(title_start, title_start + title_count)
+        self.write(
+            Title, ('id', 'name', 'year', 'description', 'category'),
+            ((pk, self.text(rnd.randint(1, 4)).capitalize(),
+              rnd.randint(1900, self.now.year), self.text(30),
+              rnd.choice(category_ids))
+             for pk in title_ids)
+        )
+        self.write(Title.genre.through, ('title_id', 'genre_id'), (
+            (pk, genre_id)
+            for pk in title_ids
+            for genre_id in rnd.sample(genre_ids, rnd.randint(1, 3))
+        ))
+
+        weights = list(itertools.accumulate(
+            1 / rank ** options['skew'] for rank in range(1, title_count + 1)
+        ))
+        popular = list(title_ids)
+        rnd.shuffle(popular)
+        review_start = self.next_id(Review)
+        review_count = self.write(
+            Review, ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+            self.reviews(review_start, user_ids, popular, weights,
+                         options['reviews_per_user'])
+        )
+        comment_start = self.next_id(Comment)
+        self.write(
+            Comment, ('id', 'review_id', 'text', 'author', 'pub_date'),
+            self.comments(comment_start, review_start, review_count,
+                          user_ids)
+        )
+
+    def reviews(self, start, user_ids, titles, weights, per_user):
+        rnd = self.random
+        pk = start
+        limit = len(titles)
+        for user_id in user_ids:
+            count = min(int(rnd.expovariate(1 / per_user)) + 1, limit)
+            chosen = set()
+            while len(chosen) < count:
+                chosen.update(rnd.choices(titles, cum_weights=weights,
+                                          k=count - len(chosen)))
+            for title_id in chosen:
+                score = min(max(int(rnd.gauss(7, 2)), 1), 10)
+                yield (pk, title_id, self.text(rnd.randint(5, 60)),
+                       user_id, score, self.random_date())
+                pk += 1
+
+    def comments(self, start, review_start, review_count, user_ids):
+        rnd = self.random
+        pk = start
+        for review_id in range(review_start, review_start + review_count):
+            if rnd.random() > 0.3:
+                continue
+            for _ in range(int(rnd.expovariate(1 / 3)) + 1):
+                yield (pk, review_id, self.text(rnd.randint(3, 30)),
+                       rnd.choice(user_ids), self.random_date(365))
+                pk += 1
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import Title
+from reviews.signals import rating_average, recount_ratings
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сохранённые суммы, количества и распределения '
+            'оценок произведений или проверяет расхождение сумм с отзывами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, ничего не записывая.'
+        )
+
+    def handle(self, *args, **options):
+        drifted = Title.objects.annotate(
+            actual_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_count=Count('reviews')
+        ).filter(
+            ~Q(rating_sum=F('actual_sum'))
+            | ~Q(rating_count=F('actual_count'))
+            | ~Q(rating_average=rating_average(F('rating_sum'),
+                                               F('rating_count')))
+        ).values_list('pk', 'rating_sum', 'rating_count',
+                      'actual_sum', 'actual_count')
+        if options['check']:
+            rows = list(drifted)
+            for pk, stored_sum, stored_count, real_sum, real_count in rows:
+                self.stdout.write(
+                    f'Произведение {pk}: сохранено {stored_sum}/{stored_count}'
+                    f', по отзывам {real_sum}/{real_count}'
+                )
+            if rows:
+                raise CommandError(f'Расхождений найдено: {len(rows)}')
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+            return
+        with transaction.atomic():
+            updated = recount_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны для произведений: {updated}'
+        ))
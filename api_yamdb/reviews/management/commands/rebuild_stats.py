@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Category, CategoryStats, Genre, GenreStats
+from reviews.stats import recount_sections
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сводную статистику жанров и категорий '
+            'по сохранённым итогам оценок произведений.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            genres = recount_sections(Genre, GenreStats, 'genre')
+            categories = recount_sections(Category, CategoryStats,
+                                          'category')
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика пересчитана: жанров {genres}, '
+            f'категорий {categories}'
+        ))
@@ -0,0 +1,67 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:55
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def fill_section_stats(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    for section, stats_name in (('genre', 'GenreStats'),
+                                ('category', 'CategoryStats')):
+        Section = apps.get_model('reviews', section.capitalize())
+        Stats = apps.get_model('reviews', stats_name)
+        totals = {
+            row[section]: row
+            for row in Title.objects.filter(
+                **{f'{section}__isnull': False}
+            ).order_by().values(section).annotate(
+                title_count=Count('pk'),
+                review_count=Sum('rating_count'),
+                score_sum=Sum('rating_sum')
+            )
+        }
+        Stats.objects.bulk_create(
+            Stats(pk=pk,
+                  title_count=totals.get(pk, {}).get('title_count', 0),
+                  review_count=totals.get(pk, {}).get('review_count', 0),
+                  score_sum=totals.get(pk, {}).get('score_sum', 0))
+            for pk in Section.objects.values_list('pk', flat=True)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('title_count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreStats',
+            fields=[
+                ('title_count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('genre', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Статистика жанра',
+                'verbose_name_plural': 'Статистика жанров',
+            },
+        ),
+        migrations.RunPython(fill_section_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:19
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import (ExpressionWrapper, F, FloatField, OuterRef,
+                              Subquery)
+from django.db.models.functions import Cast
+
+# SQLite пересоздаёт reviews_title при добавлении поля, и триггеры
+# полнотекстового индекса из 0006_title_search пропадают вместе со
+# старой таблицей.
+FTS_TRIGGERS = [
+    statement for statement in import_module(
+        'reviews.migrations.0006_title_search'
+    ).SQLITE_FORWARD if statement.startswith('CREATE TRIGGER')
+]
+
+
+def restore_fts_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in FTS_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+def fill_rating_average(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    Title.objects.filter(rating_count__gt=0).update(
+        rating_average=ExpressionWrapper(
+            Cast(F('rating_sum'), FloatField()) / F('rating_count'),
+            output_field=FloatField()
+        )
+    )
+    TitleRanking.objects.update(rating=Subquery(
+        Title.objects.filter(pk=OuterRef('title_id')).values(
+            'rating_average'
+        )[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_score_histogram'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop,
+                             restore_fts_triggers),
+        migrations.AddField(
+            model_name='title',
+            name='rating_average',
+            field=models.FloatField(default=0, editable=False, verbose_name='Средняя оценка'),
+        ),
+        migrations.RunPython(restore_fts_triggers,
+                             migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='titleranking',
+            name='rating',
+            field=models.FloatField(verbose_name='Средняя оценка'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating_average'], name='title_rating_idx'),
+        ),
+        migrations.RunPython(fill_rating_average, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, router, transaction
 
 
 class User(AbstractUser):
@@ -50,6 +50,11 @@ class User(AbstractUser):
         default=USER,
         max_length=10
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия токенов'
+    )
 
     class Meta:
         ordering = ('-pk',)
@@ -62,6 +67,30 @@ class User(AbstractUser):
     def __str__(self):
         return f'{self.username}: {self.email}, уровень доступа: {self.role}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_access = instance.get_access_state()
+        if 'username' in instance.__dict__:
+            instance._loaded_username = instance.username
+        return instance
+
+    def get_access_state(self):
+        loaded = self.__dict__
+        return tuple(loaded.get(name)
+                     for name in ('role', 'is_superuser', 'is_active'))
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_access', None)
+        if loaded is not None and loaded != self.get_access_state():
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'
+                }
+        super().save(*args, **kwargs)
+        self._loaded_access = self.get_access_state()
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_superuser
@@ -136,20 +165,51 @@ class Title(models.Model):
         null=True,
         verbose_name='Категория произведения'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок'
+    )
+    rating_average = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name='Средняя оценка'
+    )
 
     class Meta:
         ordering = ['name']
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['category', 'name'],
+                         name='title_category_name_idx'),
+            models.Index(fields=['year', 'name'],
+                         name='title_year_name_idx'),
+            models.Index(fields=['-rating_average'],
+                         name='title_rating_idx'),
+        )
 
     def __str__(self):
         return self.name
 
     @property
     def rating(self):
-        reviews = self.reviews.all()
-        score_avg = reviews.aggregate(models.Avg('score')).get('score__avg')
-        return None if isinstance(score_avg, type(None)) else int(score_avg)
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'category_id' in instance.__dict__:
+            instance._loaded_category_id = instance.category_id
+        return instance
 
 
 class Review(models.Model):
@@ -183,10 +243,44 @@ class Review(models.Model):
                 name='unique_author_title'
             ),
         )
+        indexes = (
+            models.Index(fields=['title', '-pub_date', '-id'],
+                         name='review_title_pub_date_idx'),
+        )
 
     def __str__(self):
         return f'{self.title}, {self.score}, {self.author}'
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self._state.adding:
+                self.lock_stored_score()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self.lock_stored_score():
+                return 0, {}
+            return super().delete(*args, **kwargs)
+
+    def lock_stored_score(self):
+        row = Review.objects.using(
+            router.db_for_write(Review, instance=self)
+        ).select_for_update().filter(pk=self.pk).values_list(
+            'score', 'title_id'
+        ).first()
+        if row is None:
+            return False
+        self._loaded_score, self._loaded_title_id = row
+        return True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -209,6 +303,151 @@ class Comment(models.Model):
         ordering = ["-pub_date"]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(fields=['review', '-pub_date', '-id'],
+                         name='comment_review_pub_date_idx'),
+        )
 
     def __str__(self):
         return f'{self.author}, {self.pub_date:%d.%m.%Y}, {self.text}'
+
+
+class TitleRanking(models.Model):
+    OVERALL = 'all'
+
+    scope = models.CharField(
+        max_length=50,
+        verbose_name='Раздел рейтинга'
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Произведение'
+    )
+    rating = models.FloatField(verbose_name='Средняя оценка')
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов'
+    )
+
+    class Meta:
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Позиции в рейтинге'
+        constraints = (
+            models.UniqueConstraint(
+                fields=['scope', 'title'],
+                name='unique_scope_title'
+            ),
+        )
+        indexes = (
+            models.Index(fields=['scope', '-rating', '-review_count',
+                                 'title'],
+                         name='ranking_scope_rating_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.scope}: {self.title_id}, {self.rating}'
+
+    @staticmethod
+    def genre_scope(genre_id):
+        return f'genre:{genre_id}'
+
+    @staticmethod
+    def category_scope(category_id):
+        return f'category:{category_id}'
+
+
+class SectionStats(models.Model):
+    title_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество произведений'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов'
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average_score(self):
+        if not self.review_count:
+            return None
+        return round(self.score_sum / self.review_count, 2)
+
+
+class GenreStats(SectionStats):
+    genre = models.OneToOneField(
+        Genre,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Жанр'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика жанра'
+        verbose_name_plural = 'Статистика жанров'
+
+    def __str__(self):
+        return f'{self.genre_id}: {self.title_count}, {self.review_count}'
+
+
+class CategoryStats(SectionStats):
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Категория'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика категории'
+        verbose_name_plural = 'Статистика категорий'
+
+    def __str__(self):
+        return f'{self.category_id}: {self.title_count}, {self.review_count}'
+
+
+class ScoreHistogram(models.Model):
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='histogram',
+        verbose_name='Произведение'
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.counts}'
+
+    @staticmethod
+    def field_name(score):
+        return f'score_{score}'
+
+    @property
+    def counts(self):
+        return [getattr(self, self.field_name(score))
+                for score in self.SCORES]
@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from .models import Title, TitleRanking
+
+BATCH_SIZE = 1000
+
+
+def rebuild_rankings(title_ids=None):
+    rankings = TitleRanking.objects.all()
+    titles = Title.objects.filter(rating_count__gt=0)
+    links = Title.genre.through.objects.all()
+    if title_ids is not None:
+        rankings = rankings.filter(title_id__in=title_ids)
+        titles = titles.filter(pk__in=title_ids)
+        links = links.filter(title_id__in=title_ids)
+    rankings.delete()
+    genres = defaultdict(list)
+    for title_id, genre_id in links.values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    rows = []
+    for pk, rating, rating_count, category_id in titles.values_list(
+            'pk', 'rating_average', 'rating_count', 'category_id'):
+        scopes = [TitleRanking.OVERALL]
+        if category_id is not None:
+            scopes.append(TitleRanking.category_scope(category_id))
+        scopes += [TitleRanking.genre_scope(genre_id)
+                   for genre_id in genres[pk]]
+        rows += [TitleRanking(scope=scope, title_id=pk,
+                              rating=rating,
+                              review_count=rating_count)
+                 for scope in scopes]
+    for start in range(0, len(rows), BATCH_SIZE):
+        TitleRanking.objects.bulk_create(rows[start:start + BATCH_SIZE])
+    return len(rows)
+
+
+def refresh_ranking(title_id):
+    row = Title.objects.filter(pk=title_id).values_list(
+        'rating_average', 'rating_count'
+    ).first()
+    if row is None or not row[1]:
+        TitleRanking.objects.filter(title_id=title_id).delete()
+        return
+    rating, rating_count = row
+    updated = TitleRanking.objects.filter(title_id=title_id).update(
+        rating=rating,
+        review_count=rating_count
+    )
+    if not updated:
+        rebuild_rankings([title_id])
@@ -0,0 +1,239 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              IntegerField, OuterRef, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from .histograms import recount_histograms, shift_histogram
+from .models import (Category, CategoryStats, Genre, GenreStats, Review,
+                     Title, TitleRanking)
+from .rankings import rebuild_rankings, refresh_ranking
+from .stats import (get_title_sections, recount_stats, shift_sections,
+                    shift_stats, title_totals)
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_ratings():
+    if getattr(_deferred, 'title_ids', None) is not None:
+        yield
+        return
+    _deferred.title_ids = set()
+    _deferred.deleted_ids = set()
+    try:
+        yield
+        title_ids = _deferred.title_ids - _deferred.deleted_ids
+    finally:
+        _deferred.title_ids = None
+        _deferred.deleted_ids = None
+    if title_ids:
+        recount_ratings(title_ids)
+
+
+@contextmanager
+def bulk_title_writes():
+    _deferred.bulk_titles = True
+    try:
+        yield
+    finally:
+        _deferred.bulk_titles = False
+
+
+def in_bulk_title_writes():
+    return getattr(_deferred, 'bulk_titles', False)
+
+
+def rating_average(total, count):
+    return Coalesce(
+        ExpressionWrapper(Cast(total, FloatField()) / NullIf(count, 0),
+                          output_field=FloatField()),
+        0.0
+    )
+
+
+def shift_rating(title_id, score, count):
+    if getattr(_deferred, 'title_ids', None) is not None:
+        _deferred.title_ids.add(title_id)
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score,
+        rating_count=F('rating_count') + count,
+        rating_average=rating_average(F('rating_sum') + score,
+                                      F('rating_count') + count)
+    )
+    refresh_ranking(title_id)
+    shift_stats(title_id, score, count)
+
+
+def shift_scores(title_id, deltas):
+    if getattr(_deferred, 'title_ids', None) is not None:
+        _deferred.title_ids.add(title_id)
+        return
+    shift_histogram(title_id, deltas)
+
+
+def recount_ratings(title_ids=None):
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total'),
+                     output_field=IntegerField()),
+            0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total'),
+                     output_field=IntegerField()),
+            0
+        )
+    )
+    titles.update(rating_average=rating_average(F('rating_sum'),
+                                                F('rating_count')))
+    rebuild_rankings(title_ids)
+    recount_histograms(title_ids)
+    if title_ids is None:
+        recount_stats()
+    else:
+        recount_stats(*get_title_sections(title_ids))
+    return updated
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_score = getattr(instance, '_loaded_score', None)
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    if created:
+        shift_rating(instance.title_id, instance.score, 1)
+        shift_scores(instance.title_id, {instance.score: 1})
+    elif old_score is None:
+        recount_ratings([instance.title_id])
+    elif old_title_id != instance.title_id:
+        shift_rating(old_title_id, -old_score, -1)
+        shift_scores(old_title_id, {old_score: -1})
+        shift_rating(instance.title_id, instance.score, 1)
+        shift_scores(instance.title_id, {instance.score: 1})
+    elif old_score != instance.score:
+        shift_rating(instance.title_id, instance.score - old_score, 0)
+        shift_scores(instance.title_id,
+                     {old_score: -1, instance.score: 1})
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    score = getattr(instance, '_loaded_score', None)
+    if score is None:
+        score = instance.score
+    shift_rating(instance.title_id, -score, -1)
+    shift_scores(instance.title_id, {score: -1})
+
+
+@receiver(pre_save, sender=Title)
+def title_saving(sender, instance, raw=False, **kwargs):
+    if (raw or in_bulk_title_writes() or instance.pk is None
+            or hasattr(instance, '_loaded_category_id')):
+        return
+    instance._loaded_category_id = Title.objects.filter(
+        pk=instance.pk
+    ).values_list('category_id', flat=True).first()
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or in_bulk_title_writes():
+        return
+    if created:
+        shift_sections(
+            (1, instance.rating_count, instance.rating_sum), 1,
+            category_ids=[instance.category_id]
+        )
+    elif instance._loaded_category_id != instance.category_id:
+        rebuild_rankings([instance.pk])
+        totals = title_totals([instance.pk])
+        shift_sections(totals, -1,
+                       category_ids=[instance._loaded_category_id])
+        shift_sections(totals, 1, category_ids=[instance.category_id])
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    if getattr(_deferred, 'deleted_ids', None) is not None:
+        _deferred.deleted_ids.add(instance.pk)
+    genre_ids, category_ids = get_title_sections([instance.pk])
+    shift_sections(title_totals([instance.pk]), -1, genre_ids, category_ids)
+    # Отзывы удаляются каскадом после этого сигнала и вычитали бы себя из
+    # разделов второй раз: отвязываем произведение заранее.
+    Title.genre.through.objects.filter(title_id=instance.pk).delete()
+    Title.objects.filter(pk=instance.pk).update(category=None)
+
+
+def get_linked_ids(instance, reverse, pk_set):
+    links = Title.genre.through.objects.all()
+    if reverse:
+        links, column = links.filter(genre_id=instance.pk), 'title_id'
+    else:
+        links, column = links.filter(title_id=instance.pk), 'genre_id'
+    if pk_set is not None:
+        links = links.filter(**{f'{column}__in': pk_set})
+    return set(links.values_list(column, flat=True))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        instance._unlinked_ids = get_linked_ids(instance, reverse, pk_set)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_add':
+        changed, sign = pk_set, 1
+    else:
+        changed, sign = instance.__dict__.pop('_unlinked_ids', set()), -1
+    if not changed:
+        return
+    if reverse:
+        rebuild_rankings(changed)
+        shift_sections(title_totals(changed), sign, genre_ids=[instance.pk])
+    else:
+        rebuild_rankings([instance.pk])
+        shift_sections(title_totals([instance.pk]), sign, genre_ids=changed)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CategoryStats.objects.create(category=instance)
+
+
+@receiver(post_save, sender=Genre)
+def genre_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        GenreStats.objects.create(genre=instance)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    TitleRanking.objects.filter(
+        scope=TitleRanking.category_scope(instance.pk)
+    ).delete()
+
+
+@receiver(post_delete, sender=Genre)
+def genre_deleted(sender, instance, **kwargs):
+    TitleRanking.objects.filter(
+        scope=TitleRanking.genre_scope(instance.pk)
+    ).delete()
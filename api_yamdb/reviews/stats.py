@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import Category, CategoryStats, Genre, GenreStats, Title
+
+
+def shift_stats(title_id, score, count):
+    changes = {'review_count': F('review_count') + count,
+               'score_sum': F('score_sum') + score}
+    GenreStats.objects.filter(genre__title=title_id).update(**changes)
+    CategoryStats.objects.filter(category__title=title_id).update(**changes)
+
+
+def title_totals(title_ids):
+    with transaction.atomic(savepoint=False):
+        rows = list(
+            Title.objects.select_for_update().filter(
+                pk__in=title_ids
+            ).order_by('pk').values_list('rating_count', 'rating_sum')
+        )
+    return (len(rows), sum(count for count, _ in rows),
+            sum(total for _, total in rows))
+
+
+def shift_sections(totals, sign, genre_ids=(), category_ids=()):
+    titles, reviews, scores = (sign * value for value in totals)
+    changes = {'title_count': F('title_count') + titles,
+               'review_count': F('review_count') + reviews,
+               'score_sum': F('score_sum') + scores}
+    if genre_ids:
+        GenreStats.objects.filter(pk__in=genre_ids).update(**changes)
+    category_ids = [pk for pk in category_ids if pk is not None]
+    if category_ids:
+        CategoryStats.objects.filter(pk__in=category_ids).update(**changes)
+
+
+def get_title_sections(title_ids):
+    genre_ids = set(Title.genre.through.objects.filter(
+        title_id__in=title_ids
+    ).values_list('genre_id', flat=True))
+    category_ids = set(Title.objects.filter(
+        pk__in=title_ids, category__isnull=False
+    ).values_list('category_id', flat=True))
+    return genre_ids, category_ids
+
+
+def recount_sections(model, stats_model, field, ids=None):
+    sections = model.objects.all()
+    lookup = {f'{field}__isnull': False}
+    if ids is not None:
+        sections = sections.filter(pk__in=ids)
+        lookup = {f'{field}__in': ids}
+    titles = Title.objects.filter(**lookup)
+    totals = {
+        row[field]: row for row in titles.order_by().values(field).annotate(
+            title_count=Count('pk'),
+            review_count=Sum('rating_count'),
+            score_sum=Sum('rating_sum')
+        )
+    }
+    section_ids = list(sections.values_list('pk', flat=True))
+    empty = {'title_count': 0, 'review_count': 0, 'score_sum': 0}
+    if ids is None:
+        stats_model.objects.all().delete()
+        stats_model.objects.bulk_create(
+            stats_model(pk=pk, **{
+                key: totals.get(pk, empty)[key] for key in empty
+            })
+            for pk in section_ids
+        )
+        return len(section_ids)
+    for pk in section_ids:
+        values = {key: totals.get(pk, empty)[key] for key in empty}
+        if not stats_model.objects.filter(pk=pk).update(**values):
+            stats_model.objects.create(pk=pk, **values)
+    return len(section_ids)
+
+
+def recount_stats(genre_ids=None, category_ids=None):
+    if genre_ids is None or genre_ids:
+        recount_sections(Genre, GenreStats, 'genre', genre_ids)
+    if category_ids is not None:
+        category_ids = {pk for pk in category_ids if pk is not None}
+    if category_ids is None or category_ids:
+        recount_sections(Category, CategoryStats, 'category', category_ids)
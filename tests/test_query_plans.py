@@ -0,0 +1,12 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_endpoint_queries_use_indexes():
+    call_command('generate_dataset', scale=0.1, stdout=StringIO())
+    output = StringIO()
+    call_command('explain_queries', stdout=output)
+    assert 'Все запросы используют индексы' in output.getvalue()
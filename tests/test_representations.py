@@ -0,0 +1,65 @@
+import pytest
+
+from api.representations import (COMMENT_VALUES, REVIEW_VALUES,
+                                 TITLE_VALUES, represent_comments,
+                                 represent_reviews, represent_titles)
+from api.serializers import (CommentSerializer, ReadTitleSerializer,
+                             ReviewSerializer)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    first = User.objects.create(username='first', email='first@yamdb.ru')
+    second = User.objects.create(username='second', email='second@yamdb.ru')
+    rated = Title.objects.create(
+        name='С отзывами', year=1999, description='Описание',
+        category=category
+    )
+    rated.genre.set([comedy, drama])
+    Title.objects.create(name='Без жанров и категории')
+    Title.objects.create(name='Без отзывов', year=2020, category=category)
+    review = Review.objects.create(
+        title=rated, author=first, text='Хорошо', score=7
+    )
+    Review.objects.create(title=rated, author=second, text='Отлично', score=8)
+    Comment.objects.create(review=review, author=second, text='Согласен')
+    Comment.objects.create(review=review, author=first, text='Спасибо')
+
+
+def assert_same(serializer_class, represent, values, queryset):
+    expected = [
+        dict(item) for item in
+        serializer_class(list(queryset.order_by('pk')), many=True).data
+    ]
+    actual = represent(list(
+        queryset.prefetch_related(None).order_by('pk').values(*values)
+    ))
+    assert actual == expected
+
+
+@pytest.mark.django_db
+def test_titles_match_serializer(catalog):
+    assert_same(
+        ReadTitleSerializer, represent_titles, TITLE_VALUES,
+        Title.objects.select_related('category').prefetch_related('genre')
+    )
+
+
+@pytest.mark.django_db
+def test_reviews_match_serializer(catalog):
+    assert_same(
+        ReviewSerializer, represent_reviews, REVIEW_VALUES,
+        Review.objects.select_related('author')
+    )
+
+
+@pytest.mark.django_db
+def test_comments_match_serializer(catalog):
+    assert_same(
+        CommentSerializer, represent_comments, COMMENT_VALUES,
+        Comment.objects.select_related('author')
+    )